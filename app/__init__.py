@@ -6,6 +6,7 @@ Main entry point for initializing the Flask application.
 
 This module is responsible for:
     - Configuring Flask extensions (SQLAlchemy, Migrate, Marshmallow)
+    - Installing the orjson based JSON provider
     - Registering custom error handlers
     - Registering REST API routes
     - Creating the Flask application via the `create_app` factory
@@ -25,6 +26,7 @@ from flask_cors import CORS
 
 from .models import db
 from .logger import logger
+from .json_provider import OrjsonProvider
 from .routes import register_routes
 
 # Initialisation des extensions Flask
@@ -84,6 +86,7 @@ def create_app(config_class):
     logger.info("Creating app in %s environment.", env)
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
     if env == 'development':
         CORS(
             app,
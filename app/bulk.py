@@ -0,0 +1,128 @@
+"""
+bulk.py
+-------
+
+This module groups the helpers that validate and insert many Company records
+at once. They are shared by the import endpoints and by POST /companies/bulk.
+
+Functions:
+    - company_row(validated, seen_names): INSERT parameters of a record.
+    - existing_values(column, values): Values already stored in a column.
+    - check_references(candidates, errors): Name and parent checks.
+    - bulk_insert(rows): Batched INSERT of company rows.
+"""
+from marshmallow import ValidationError
+from sqlalchemy import insert, select
+from app.models import Company, canonical_id, db
+
+# Maximum number of rows sent to the database in a single INSERT statement.
+BATCH_SIZE = 1000
+
+# Company fields copied from validated records.
+ROW_FIELDS = (
+    'name', 'description', 'logo_url', 'parent_id', 'address', 'email',
+    'phone_number', 'website', 'registration_number', 'tax_id', 'country',
+    'city', 'postal_code', 'employees_count',
+)
+
+
+def company_row(validated, seen_names):
+    """
+    Build the INSERT parameters for a validated Company record.
+
+    Args:
+        validated (dict): The record loaded by the import schema.
+        seen_names (set): Names already accepted earlier in the same batch;
+            updated in place.
+
+    Raises:
+        ValidationError: If the name is duplicated within the batch.
+
+    Returns:
+        dict: Column values for the new row; the ID is generated on insert.
+    """
+    if validated['name'] in seen_names:
+        raise ValidationError({"name": ["Name must be unique."]})
+    seen_names.add(validated['name'])
+
+    return {field: validated.get(field) for field in ROW_FIELDS}
+
+
+def existing_values(column, values):
+    """
+    Find which of the given values are already stored in a Company column.
+
+    Args:
+        column (Column): The Company column to search.
+        values (set): The values to look for.
+
+    Returns:
+        set: The values found, queried BATCH_SIZE at a time.
+    """
+    values = list(values)
+    found = set()
+    for start in range(0, len(values), BATCH_SIZE):
+        batch = values[start:start + BATCH_SIZE]
+        found.update(
+            db.session.execute(
+                select(column).where(column.in_(batch))
+            ).scalars()
+        )
+    return found
+
+
+def check_references(candidates, errors):
+    """
+    Check name uniqueness and parent existence for all records at once.
+
+    Args:
+        candidates (list): (index, row) pairs of schema-validated records.
+        errors (list): Validation errors; an {"index", "errors"} dict with
+            the error messages of each rejected record is appended to it.
+
+    Returns:
+        list: The rows that passed both checks.
+    """
+    taken_names = existing_values(
+        Company.name, {row['name'] for _, row in candidates}
+    )
+    parent_ids = {
+        canonical_id(row['parent_id'])
+        for _, row in candidates if row['parent_id']
+    }
+    parent_ids.discard(None)
+    known_parents = existing_values(Company.id, parent_ids)
+
+    rows = []
+    for idx, row in candidates:
+        messages = {}
+        if row['name'] in taken_names:
+            messages['name'] = ["Name must be unique."]
+        if row['parent_id']:
+            row['parent_id'] = canonical_id(row['parent_id'])
+            if row['parent_id'] not in known_parents:
+                messages['parent_id'] = ["Parent company does not exist."]
+        if messages:
+            errors.append({"index": idx, "errors": messages})
+        else:
+            rows.append(row)
+    errors.sort(key=lambda error: error['index'])
+    return rows
+
+
+def bulk_insert(rows):
+    """
+    Insert company rows in batches of BATCH_SIZE and commit once.
+
+    Args:
+        rows (list): Column values for each new Company row.
+    """
+    # A Core INSERT on the table skips the ORM bulk path (mapper lookups,
+    # attribute events and state bookkeeping) that plain rows do not need.
+    # Both timestamps are set as Company.create sets them.
+    statement = insert(Company.__table__).values(
+        created_at=db.func.now(), updated_at=db.func.now()
+    )
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(statement, rows[start:start + BATCH_SIZE])
+    db.session.commit()
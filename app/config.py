@@ -13,16 +13,50 @@ Classes:
     - ProductionConfig: Configuration for production.
 
 Each class defines main parameters such as the secret key, database URL,
-debug mode, and SQLAlchemy modification tracking.
+debug mode, SQLAlchemy modification tracking and engine options.
+
+Functions:
+    - engine_options(database_uri): Build the SQLAlchemy engine options
+      suited to the database backend.
 """
 
 import os
 
 
+def engine_options(database_uri):
+    """
+    Build the SQLAlchemy engine options for the given database URL.
+
+    Args:
+        database_uri (str): The SQLAlchemy database URL.
+
+    Returns:
+        dict: Options passed to the engine through SQLALCHEMY_ENGINE_OPTIONS.
+    """
+    options = {}
+    if not database_uri.startswith('sqlite'):
+        # Keep enough pooled connections for concurrent requests and
+        # discard stale ones before they are handed out.
+        options.update(
+            pool_size=int(os.environ.get('DB_POOL_SIZE', '25')),
+            max_overflow=int(os.environ.get('DB_MAX_OVERFLOW', '25')),
+            pool_pre_ping=True,
+            pool_recycle=1800,
+        )
+    if database_uri.startswith(('postgresql://', 'postgresql+psycopg2://')):
+        # Send executemany() INSERTs as multi-row VALUES statements.
+        options['executemany_mode'] = 'values_plus_batch'
+    return options
+
+
 class Config:
     """Base configuration common to all environments."""
     SECRET_KEY = os.environ.get('SECRET_KEY', 'dev')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Memoize the outcome of payload validations (see app.schemas).
+    VALIDATION_CACHE = (
+        os.environ.get('VALIDATION_CACHE', 'false').lower() == 'true'
+    )
 
 
 class DevelopmentConfig(Config):
@@ -31,6 +65,7 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     if not SQLALCHEMY_DATABASE_URI:
         raise ValueError("DATABASE_URL environment variable is not set.")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class TestingConfig(Config):
@@ -39,6 +74,7 @@ class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     if not SQLALCHEMY_DATABASE_URI:
         raise ValueError("DATABASE_URL environment variable is not set.")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class StagingConfig(Config):
@@ -47,6 +83,7 @@ class StagingConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     if not SQLALCHEMY_DATABASE_URI:
         raise ValueError("DATABASE_URL environment variable is not set.")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class ProductionConfig(Config):
@@ -55,3 +92,4 @@ class ProductionConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL')
     if not SQLALCHEMY_DATABASE_URI:
         raise ValueError("DATABASE_URL environment variable is not set.")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
@@ -0,0 +1,167 @@
+"""
+json_provider.py
+----------------
+
+This module defines the Flask JSON provider used by the application.
+
+It replaces Flask's default provider, built on the standard library json
+module, with orjson so that request bodies and JSON responses are parsed and
+serialized in C.
+
+Classes:
+    - OrjsonProvider: Flask JSON provider backed by orjson.
+
+Functions:
+    - output_json(data, code, headers): Flask-RESTful representation of the
+      values returned by the resources, serialized with orjson.
+"""
+
+import decimal
+import orjson
+from flask import current_app
+from flask.json.provider import JSONProvider
+
+
+def _default(obj):
+    """
+    Serialize the types orjson does not support natively.
+
+    Args:
+        obj: The object to serialize.
+
+    Raises:
+        TypeError: If the object type is not supported.
+
+    Returns:
+        str: The serialized value.
+    """
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(
+        f"Object of type {type(obj).__name__} is not JSON serializable"
+    )
+
+
+class OrjsonProvider(JSONProvider):
+    """
+    Flask JSON provider backed by orjson.
+
+    Dates, datetimes, UUIDs and dataclasses are handled natively by orjson;
+    dates are rendered in ISO 8601 format. As with Flask's default provider,
+    keys are sorted unless sort_keys is disabled, and responses are indented
+    in debug mode or when compact is False; orjson only indents by two
+    spaces, whatever indent is requested.
+
+    Attributes:
+        sort_keys (bool): Whether to sort the keys of the serialized objects.
+        compact (bool): Whether to leave responses unindented; None indents
+            them in debug mode only.
+    """
+
+    sort_keys = True
+    compact = None
+
+    def _options(self, sort_keys, indent):
+        """
+        Build the orjson options matching the json.dumps arguments.
+
+        Args:
+            sort_keys (bool): Whether to sort the keys.
+            indent (int | str | None): The requested indentation, if any.
+
+        Returns:
+            int: The orjson option flags.
+        """
+        option = 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        """
+        Serialize data as a JSON string.
+
+        Args:
+            obj: The data to serialize.
+            **kwargs: json.dumps arguments; sort_keys (defaulting to the
+                sort_keys attribute) and indent are honoured, the others
+                are ignored.
+
+        Returns:
+            str: The JSON document.
+        """
+        option = self._options(
+            kwargs.get('sort_keys', self.sort_keys), kwargs.get('indent')
+        )
+        return orjson.dumps(obj, default=_default, option=option).decode(
+            'utf-8'
+        )
+
+    def loads(self, s, **kwargs):
+        """
+        Deserialize a JSON document.
+
+        Args:
+            s (str | bytes): The JSON document.
+            **kwargs: Ignored, accepted for compatibility with json.loads.
+
+        Raises:
+            orjson.JSONDecodeError: If the document is not valid JSON (a
+            subclass of ValueError, as Flask expects).
+
+        Returns:
+            The deserialized data.
+        """
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        Serialize the arguments as JSON into an application/json response.
+
+        The body is passed to the response as bytes, skipping the decode and
+        re-encode round trip of dumps().
+
+        Returns:
+            Response: The JSON response.
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (
+            (self.compact is None and self._app.debug)
+            or self.compact is False
+        )
+        return self._app.response_class(
+            orjson.dumps(
+                obj, default=_default,
+                option=self._options(self.sort_keys, indent)
+            ),
+            mimetype="application/json"
+        )
+
+
+def output_json(data, code, headers=None):
+    """
+    Build the JSON response of a Flask-RESTful resource.
+
+    Flask-RESTful serializes the values returned by resources with the
+    standard library json module, bypassing the application JSON provider;
+    this representation serializes them with orjson instead.
+
+    Args:
+        data: The data returned by the resource.
+        code (int): The HTTP status code.
+        headers (dict, optional): Additional response headers.
+
+    Returns:
+        Response: The JSON response.
+    """
+    response = current_app.response_class(
+        orjson.dumps(data, default=_default),
+        status=code,
+        mimetype="application/json"
+    )
+    response.headers.extend(headers or {})
+    return response
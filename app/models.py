@@ -8,10 +8,38 @@ organization, and provides utility methods for database record management.
 """
 import uuid
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import bindparam, exists, or_, select
 
 db = SQLAlchemy()
 
 
+def new_id():
+    """
+    Generate the identifier of a new Company record.
+
+    Returns:
+        str: A random UUID in its canonical string form.
+    """
+    return str(uuid.uuid4())
+
+
+def canonical_id(value):
+    """
+    Return the canonical form of a Company identifier.
+
+    Args:
+        value (str): The identifier to normalise.
+
+    Returns:
+        str: The lowercase hyphenated UUID, or None if the value is not a
+        valid UUID.
+    """
+    try:
+        return str(uuid.UUID(value))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
 class Company(db.Model):
     """
     Data model for a Company entity.
@@ -19,20 +47,29 @@ class Company(db.Model):
     This model represents a company, including its general information,
     hierarchical relationships (parent_id), organization association,
     and provides CRUD (Create, Read, Update, Delete) utility methods.
+
+    The create, update and delete methods only change the database session;
+    committing the transaction is left to the caller.
     """
 
     __tablename__ = 'companies'
+    __table_args__ = (
+        db.Index('ix_companies_country_city', 'country', 'city'),
+    )
 
-    id = db.Column(db.String(40), primary_key=True)
-    name = db.Column(db.String(100), nullable=False)
+    id = db.Column(db.Uuid(as_uuid=False), primary_key=True, default=new_id)
+    name = db.Column(
+        db.String(100), nullable=False, unique=True, index=True
+    )
     description = db.Column(db.String(500), nullable=True)
     logo_url = db.Column(db.String(255), nullable=True)
     parent_id = db.Column(
-        db.String(100),
+        db.Uuid(as_uuid=False),
         db.ForeignKey('companies.id'),
-        nullable=True
+        nullable=True,
+        index=True
     )
-    organization_id = db.Column(db.String(100), nullable=True)
+    organization_id = db.Column(db.String(100), nullable=True, index=True)
     address = db.Column(db.String(255), nullable=True)
     email = db.Column(db.String(100), nullable=True)
     phone_number = db.Column(db.String(20), nullable=True)
@@ -47,42 +84,55 @@ class Company(db.Model):
     postal_code = db.Column(db.String(20), nullable=True)
     employees_count = db.Column(db.Integer, nullable=True)
 
+    # Subsidiaries of this company. Loaded lazily so plain reads do not pay
+    # for it; hierarchy queries should load it in bulk with
+    # selectinload(Company.children) to avoid one SELECT per company.
+    # Deleting a company leaves its children to the database foreign key
+    # rather than loading them to clear their parent_id.
+    children = db.relationship(
+        'Company',
+        backref=db.backref('parent', remote_side=[id]),
+        passive_deletes=True
+    )
+
+    # Attributes that may be changed through update().
+    UPDATABLE_FIELDS = frozenset({
+        'name', 'description', 'logo_url', 'parent_id', 'organization_id',
+        'address', 'email', 'phone_number', 'website', 'registration_number',
+        'tax_id', 'country', 'city', 'postal_code', 'employees_count',
+        'is_active',
+    })
+
     def __repr__(self):
         """
-        Returns a string representation of the Company object.
+        Returns a short string representation of the Company object.
         """
-        return (
-            f"<Company {self.name}> ("
-            f"ID: {self.id}, "
-            f"Description: {self.description}, "
-            f"Logo URL: {self.logo_url}, "
-            f"Parent ID: {self.parent_id}, "
-            f"Organization ID: {self.organization_id}, "
-            f"Address: {self.address}, "
-            f"Email: {self.email}, "
-            f"Phone Number: {self.phone_number}, "
-            f"Website: {self.website}, "
-            f"Created At: {self.created_at}, "
-            f"Updated At: {self.updated_at}, "
-            f"Is Active: {self.is_active}, "
-            f"Registration Number: {self.registration_number}, "
-            f"Tax ID: {self.tax_id}, "
-            f"Country: {self.country}, "
-            f"City: {self.city}, "
-            f"Postal Code: {self.postal_code}, "
-            f"Employees Count: {self.employees_count}"
-            f")"
-        )
+        return f"<Company id={self.id} name={self.name!r}>"
 
     @classmethod
-    def get_all(cls):
+    def get_page_rows(cls, fields, limit, offset=0):
         """
-        Retrieve all Company records from the database.
+        Retrieve a page of Company rows ordered by ID.
+
+        Only the requested columns are selected and the rows are returned as
+        plain tuples: no Company object is built.
+
+        Args:
+            fields (tuple): Names of the columns to select, in row order.
+            limit (int): Maximum number of rows to return.
+            offset (int, optional): Number of rows to skip.
 
         Returns:
-            list: List of all Company objects.
+            list: The rows of the requested page.
         """
-        return cls.query.all()
+        columns = cls.__table__.c
+        statement = (
+            select(*(columns[field] for field in fields))
+            .order_by(columns.id)
+            .limit(limit)
+            .offset(offset)
+        )
+        return db.session.execute(statement).all()
 
     @classmethod
     def get_by_id(cls, company_id):
@@ -93,22 +143,74 @@ class Company(db.Model):
             company_id (str): The unique identifier of the company.
 
         Returns:
-            Company: The Company object if found, else None.
+            Company: The Company object if found, else None (including when
+            the identifier is not a valid UUID).
         """
-        return cls.query.get(company_id)
+        company_id = canonical_id(company_id)
+        if company_id is None:
+            return None
+        return db.session.get(cls, company_id)
 
     @classmethod
-    def get_by_name(cls, name):
+    def name_exists(cls, name):
         """
-        Retrieve a Company record by its name.
+        Tell whether a Company record uses the given name.
+
+        The check is an EXISTS query answered from the unique name index; no
+        Company object is built.
 
         Args:
             name (str): The name of the company.
 
         Returns:
-            Company: The Company object if found, else None.
+            bool: True if a company has this name.
         """
-        return cls.query.filter_by(name=name).first()
+        return db.session.execute(
+            COMPANY_NAME_EXISTS, {"name": name}
+        ).scalar()
+
+    @classmethod
+    def id_exists(cls, company_id):
+        """
+        Tell whether a Company record has the given ID.
+
+        Args:
+            company_id (str): The unique identifier of the company.
+
+        Returns:
+            bool: True if the company exists, False otherwise (including when
+            the identifier is not a valid UUID).
+        """
+        company_id = canonical_id(company_id)
+        if company_id is None:
+            return False
+        return db.session.execute(
+            COMPANY_ID_EXISTS, {"company_id": company_id}
+        ).scalar()
+
+    @classmethod
+    def get_references(cls, name=None, company_id=None):
+        """
+        Retrieve, in a single query, the companies matching a name or an ID.
+
+        Args:
+            name (str, optional): The company name to look for.
+            company_id (str, optional): The company ID to look for; ignored
+                if it is not a valid UUID.
+
+        Returns:
+            list: (id, name) rows of the matching companies.
+        """
+        conditions = []
+        if isinstance(name, str):
+            conditions.append(cls.name == name)
+        company_id = canonical_id(company_id)
+        if company_id is not None:
+            conditions.append(cls.id == company_id)
+        if not conditions:
+            return []
+        statement = select(cls.id, cls.name).where(or_(*conditions))
+        return db.session.execute(statement).all()
 
     @classmethod
     def create(cls,
@@ -129,7 +231,10 @@ class Company(db.Model):
                employees_count=None,
                ):
         """
-        Create a new Company record and add it to the database.
+        Create a new Company record and add it to the database session.
+
+        The record is not committed: the caller commits the session once,
+        e.g. at the end of the request.
 
         Args:
             name (str): Name of the company.
@@ -151,9 +256,7 @@ class Company(db.Model):
         Returns:
             Company: The created Company object.
         """
-        company_id = str(uuid.uuid4())
         company = cls(
-            id=company_id,
             name=name,
             description=description,
             logo_url=logo_url,
@@ -174,88 +277,42 @@ class Company(db.Model):
             updated_at=db.func.now()
             )
         db.session.add(company)
-        db.session.commit()
         return company
 
-    def update(
-        self,
-        name=None,
-        description=None,
-        logo_url=None,
-        parent_id=None,
-        organization_id=None,
-        address=None,
-        email=None,
-        phone_number=None,
-        website=None,
-        registration_number=None,
-        tax_id=None,
-        country=None,
-        city=None,
-        postal_code=None,
-        employees_count=None,
-        is_active=None
-    ):
+    def update(self, **fields):
         """
-        Update the attributes of the Company entity and save changes.
+        Update the attributes of the Company entity.
+
+        Only the fields listed in UPDATABLE_FIELDS are applied; unknown keys
+        and None values are ignored. The change is not committed: the caller
+        commits the session once the request is processed.
 
         Args:
-            name (str, optional): New name.
-            description (str, optional): New description.
-            logo_url (str, optional): New logo URL.
-            parent_id (str, optional): New parent company ID.
-            organization_id (str, optional): New organization ID.
-            address (str, optional): New address.
-            email (str, optional): New email.
-            phone_number (str, optional): New phone number.
-            website (str, optional): New website.
-            registration_number (str, optional): New registration number.
-            tax_id (str, optional): New tax ID.
-            country (str, optional): New country.
-            city (str, optional): New city.
-            postal_code (str, optional): New postal code.
-            employees_count (int, optional): New number of employees.
-            is_active (bool, optional): Active status.
+            **fields: New values keyed by attribute name (name, description,
+                logo_url, parent_id, organization_id, address, email,
+                phone_number, website, registration_number, tax_id, country,
+                city, postal_code, employees_count, is_active).
         """
-        if name is not None:
-            self.name = name
-        if description is not None:
-            self.description = description
-        if logo_url is not None:
-            self.logo_url = logo_url
-        if parent_id is not None:
-            self.parent_id = parent_id
-        if organization_id is not None:
-            self.organization_id = organization_id
-        if address is not None:
-            self.address = address
-        if email is not None:
-            self.email = email
-        if phone_number is not None:
-            self.phone_number = phone_number
-        if website is not None:
-            self.website = website
-        if registration_number is not None:
-            self.registration_number = registration_number
-        if tax_id is not None:
-            self.tax_id = tax_id
-        if country is not None:
-            self.country = country
-        if city is not None:
-            self.city = city
-        if postal_code is not None:
-            self.postal_code = postal_code
-        if employees_count is not None:
-            self.employees_count = employees_count
-        if is_active is not None:
-            self.is_active = is_active
+        for field, value in fields.items():
+            if field in self.UPDATABLE_FIELDS and value is not None:
+                setattr(self, field, value)
 
         self.updated_at = db.func.now()
-        db.session.commit()
 
     def delete(self):
         """
-        Delete the Company record from the database.
+        Mark the Company record for deletion from the database.
+
+        The deletion is not committed: the caller commits the session.
         """
         db.session.delete(self)
-        db.session.commit()
+
+
+# Built once at import time: the bound parameter lets every lookup reuse the
+# compiled statement from the engine's compiled cache.
+COMPANY_NAME_EXISTS = select(
+    exists().where(Company.name == bindparam('name'))
+)
+COMPANY_ID_EXISTS = select(
+    exists().where(Company.id == bindparam('company_id'))
+)
@@ -4,18 +4,102 @@ resources.py
 This module defines the resources for managing dummy items in the application.
 It includes endpoints for creating, retrieving, updating, and deleting dummy.
 """
+import logging
+
 from flask import request
 from marshmallow import ValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from flask_restful import Resource
 
-from app.models import db, Company
-from app.schemas import CompanySchema
+from app.bulk import bulk_insert, check_references, company_row
+from app.models import db, Company, new_id
+from app.schemas import (
+    cached_validate,
+    company_dump_schema,
+    company_import_schema,
+    company_schema,
+    company_schema_partial,
+    preloaded_references,
+)
 from app.logger import logger
 
 
-company_schema = CompanySchema(session=db.session)
-company_schemas = CompanySchema(session=db.session, many=True)
+# Company attributes returned by the list endpoint.
+COMPANY_FIELDS = (
+    'id', 'name', 'description', 'logo_url', 'parent_id', 'organization_id',
+    'address', 'email', 'phone_number', 'website', 'created_at',
+    'updated_at', 'is_active', 'registration_number', 'tax_id', 'country',
+    'city', 'postal_code', 'employees_count',
+)
+
+# Number of companies returned by GET /companies when no limit is given.
+DEFAULT_PAGE_SIZE = 100
+# Largest page a client may request.
+MAX_PAGE_SIZE = 1000
+
+
+def parse_pagination(args):
+    """
+    Read the 'limit' and 'offset' query parameters.
+
+    Args:
+        args (MultiDict): The request query parameters.
+
+    Raises:
+        ValueError: If a parameter is not an integer or is out of range.
+
+    Returns:
+        tuple: The page size, capped at MAX_PAGE_SIZE, and the offset.
+    """
+    limit = int(args.get('limit', DEFAULT_PAGE_SIZE))
+    offset = int(args.get('offset', 0))
+    if limit < 1 or offset < 0:
+        raise ValueError("limit must be positive and offset non-negative.")
+    return min(limit, MAX_PAGE_SIZE), offset
+
+
+def pagination_links(base_url, limit, offset, page_length):
+    """
+    Build the RFC 8288 Link header pointing to the adjacent pages.
+
+    Args:
+        base_url (str): URL of the collection without query string.
+        limit (int): The page size.
+        offset (int): The offset of the current page.
+        page_length (int): Number of items in the current page.
+
+    Returns:
+        str: The Link header value, empty if there is no adjacent page.
+    """
+    links = []
+    if page_length == limit:
+        links.append(
+            f'<{base_url}?limit={limit}&offset={offset + limit}>; rel="next"'
+        )
+    if offset > 0:
+        links.append(
+            f'<{base_url}?limit={limit}&offset={max(offset - limit, 0)}>; '
+            'rel="prev"'
+        )
+    return ', '.join(links)
+
+
+def serialize_row(row):
+    """
+    Serialize a Company row to a JSON compatible dict.
+
+    Args:
+        row (Row): The values of COMPANY_FIELDS, in that order.
+
+    Returns:
+        dict: The row values keyed by field name; dates are rendered in ISO
+        8601 format.
+    """
+    data = dict(zip(COMPANY_FIELDS, row))
+    for field in ('created_at', 'updated_at'):
+        if data[field] is not None:
+            data[field] = data[field].isoformat()
+    return data
 
 
 class CompanyListResource(Resource):
@@ -24,7 +108,7 @@ class CompanyListResource(Resource):
 
     Methods:
         get():
-            Retrieve all companies items from the database.
+            Retrieve a page of companies items from the database.
 
         post():
             Create a new company item with the provided data.
@@ -32,16 +116,36 @@ class CompanyListResource(Resource):
 
     def get(self):
         """
-        Retrieve all companies items.
+        Retrieve a page of companies items.
+
+        Query parameters:
+            limit (int, optional): Page size, DEFAULT_PAGE_SIZE by default and
+                at most MAX_PAGE_SIZE.
+            offset (int, optional): Number of items to skip, 0 by default.
 
         Returns:
-            tuple: A tuple containing a list of serialized companies items and
-            the HTTP status code 200.
+            tuple: A list of serialized companies items, the HTTP status code
+                   200 and a Link header to the next/previous pages.
+            tuple: Error message and HTTP status code 400 if the pagination
+                   parameters are invalid.
         """
-        logger.info("Retrieving all companies items")
+        logger.info("Retrieving companies items")
+
+        try:
+            limit, offset = parse_pagination(request.args)
+        except ValueError as err:
+            logger.error("Invalid pagination parameters: %s", str(err))
+            return {"message": "Invalid pagination parameters"}, 400
+
+        # Plain rows, serialized by hand: no ORM object nor schema involved
+        rows = Company.get_page_rows(COMPANY_FIELDS, limit, offset)
+        items = [serialize_row(row) for row in rows]
 
-        companies = Company.get_all()
-        return company_schemas.dump(companies), 200
+        headers = {}
+        links = pagination_links(request.base_url, limit, offset, len(rows))
+        if links:
+            headers['Link'] = links
+        return items, 200, headers
 
     def post(self):
         """
@@ -59,9 +163,11 @@ class CompanyListResource(Resource):
 
         json_data = request.get_json()
         try:
-            company_schema.load(json_data)
+            with preloaded_references(json_data):
+                cached_validate(company_schema, json_data)
         except ValidationError as err:
-            logger.error("Validation error: %s", err.messages)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Validation error: %s", err.messages)
             return {"message": "Validation error", "errors": err.messages}, 400
 
         try:
@@ -80,6 +186,7 @@ class CompanyListResource(Resource):
                 postal_code=json_data.get('postal_code'),
                 employees_count=json_data.get('employees_count', 0)
             )
+            db.session.commit()
         except IntegrityError as e:
             db.session.rollback()
             logger.error("Integrity error: %s", str(e))
@@ -89,7 +196,77 @@ class CompanyListResource(Resource):
             logger.error("Database error: %s", str(e))
             return {"message": "Database error", "error": str(e)}, 500
 
-        return company_schema.dump(company), 201
+        return company_dump_schema.dump(company), 201
+
+
+class CompanyBulkResource(Resource):
+    """
+    Resource for creating many companies in a single request.
+
+    Methods:
+        post():
+            Validate and create a list of company items in one transaction.
+    """
+
+    def post(self):
+        """
+        Create a list of company items in one transaction.
+
+        The records are validated by the schema one by one, then the name
+        and parent checks are done for the whole list with one query each;
+        the rows are inserted in batches and committed once. Nothing is
+        created if any record is invalid.
+
+        Expects:
+            JSON array of company payloads, each with at least 'name'.
+
+        Returns:
+            tuple: The IDs of the created companies, in payload order, and
+                   HTTP status code 201 on success.
+            tuple: Error message and HTTP status code 400 or 500 on failure.
+        """
+        logger.info("Creating companies in bulk")
+
+        json_data = request.get_json()
+        if not isinstance(json_data, list):
+            logger.debug("Bulk payload is not a list")
+            return {"message": "Expected a list of companies."}, 400
+
+        candidates = []
+        errors = []
+        seen_names = set()
+        for idx, item in enumerate(json_data):
+            try:
+                validated = company_import_schema.load(item)
+                candidates.append((idx, company_row(validated, seen_names)))
+            except ValidationError as e:
+                errors.append({"index": idx, "errors": e.messages})
+
+        rows = check_references(candidates, errors)
+        if errors:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Validation error: %d invalid companies", len(errors)
+                )
+            return {"message": "Validation error", "errors": errors}, 400
+
+        for row in rows:
+            row['id'] = new_id()
+        try:
+            bulk_insert(rows)
+        except IntegrityError as e:
+            db.session.rollback()
+            logger.error("Integrity error: %s", str(e))
+            return {"message": "Integrity error", "error": str(e)}, 400
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.error("Database error: %s", str(e))
+            return {"message": "Database error", "error": str(e)}, 500
+
+        return {
+            "message": f"{len(rows)} companies created.",
+            "ids": [row['id'] for row in rows],
+        }, 201
 
 
 class CompanyResource(Resource):
@@ -129,7 +306,7 @@ class CompanyResource(Resource):
             logger.warning("Company with ID %s not found", company_id)
             return {"message": "Company not found"}, 404
 
-        return company_schema.dump(company), 200
+        return company_dump_schema.dump(company), 200
 
     def put(self, company_id):
         """
@@ -149,18 +326,20 @@ class CompanyResource(Resource):
         """
         logger.info("Updating company with ID: %s", company_id)
 
-        json_data = request.get_json()
-        try:
-            company_schema.load(json_data)
-        except ValidationError as err:
-            logger.error("Validation error: %s", err.messages)
-            return {"message": "Validation error", "errors": err.messages}, 400
-
         company = Company.get_by_id(company_id)
         if not company:
             logger.warning("Company with ID %s not found", company_id)
             return {"message": "Company not found"}, 404
 
+        json_data = request.get_json()
+        try:
+            with preloaded_references(json_data):
+                cached_validate(company_schema, json_data)
+        except ValidationError as err:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Validation error: %s", err.messages)
+            return {"message": "Validation error", "errors": err.messages}, 400
+
         try:
             company.update(
                 name=json_data['name'],
@@ -177,6 +356,7 @@ class CompanyResource(Resource):
                 postal_code=json_data.get('postal_code'),
                 employees_count=json_data.get('employees_count', 0)
             )
+            db.session.commit()
         except IntegrityError as e:
             db.session.rollback()
             logger.error("Integrity error: %s", str(e))
@@ -186,7 +366,7 @@ class CompanyResource(Resource):
             logger.error("Database error: %s", str(e))
             return {"message": "Database error", "error": str(e)}, 500
 
-        return company_schema.dump(company), 200
+        return company_dump_schema.dump(company), 200
 
     def patch(self, company_id):
         """
@@ -207,56 +387,23 @@ class CompanyResource(Resource):
         """
         logger.info("Partially updating company with ID: %s", company_id)
 
-        json_data = request.get_json()
-        try:
-            company_schema.load(json_data, partial=True)
-        except ValidationError as err:
-            logger.error("Validation error: %s", err.messages)
-            return {"message": "Validation error", "errors": err.messages}, 400
-
         company = Company.get_by_id(company_id)
         if not company:
             logger.warning("Company item with ID %s not found", company_id)
             return {"message": "Company item not found"}, 404
 
-        update_kwargs = {}
-        if 'name' in json_data:
-            update_kwargs['name'] = json_data['name']
-        if 'description' in json_data:
-            update_kwargs['description'] = json_data.get('description')
-        if 'address' in json_data:
-            update_kwargs['address'] = json_data.get('address')
-        if 'phone_number' in json_data:
-            update_kwargs['phone_number'] = json_data.get('phone_number')
-        if 'email' in json_data:
-            update_kwargs['email'] = json_data.get('email')
-        if 'website' in json_data:
-            update_kwargs['website'] = json_data.get('website')
-        if 'logo_url' in json_data:
-            update_kwargs['logo_url'] = json_data.get('logo_url')
-        if 'registration_number' in json_data:
-            update_kwargs['registration_number'] = (
-                json_data.get('registration_number'))
-        if 'tax_id' in json_data:
-            update_kwargs['tax_id'] = json_data.get('tax_id')
-        if 'country' in json_data:
-            update_kwargs['country'] = json_data.get('country')
-        if 'city' in json_data:
-            update_kwargs['city'] = json_data.get('city')
-        if 'postal_code' in json_data:
-            update_kwargs['postal_code'] = json_data.get('postal_code')
-        if 'employees_count' in json_data:
-            update_kwargs['employees_count'] = (
-                json_data.get('employees_count', 0))
-        if 'is_active' in json_data:
-            update_kwargs['is_active'] = json_data.get('is_active', True)
-        if 'organization_id' in json_data:
-            update_kwargs['organization_id'] = json_data.get('organization_id')
-        if 'parent_id' in json_data:
-            update_kwargs['parent_id'] = json_data.get('parent_id')
+        json_data = request.get_json()
+        try:
+            with preloaded_references(json_data):
+                cached_validate(company_schema_partial, json_data)
+        except ValidationError as err:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Validation error: %s", err.messages)
+            return {"message": "Validation error", "errors": err.messages}, 400
 
         try:
-            company.update(**update_kwargs)
+            company.update(**json_data)
+            db.session.commit()
         except IntegrityError as e:
             db.session.rollback()
             logger.error("Integrity error: %s", str(e))
@@ -266,7 +413,7 @@ class CompanyResource(Resource):
             logger.error("Database error: %s", str(e))
             return {"message": "Database error", "error": str(e)}, 500
 
-        return company_schema.dump(company), 200
+        return company_dump_schema.dump(company), 200
 
     def delete(self, company_id):
         """
@@ -288,6 +435,7 @@ class CompanyResource(Resource):
 
         try:
             company.delete()
+            db.session.commit()
         except SQLAlchemyError as e:
             db.session.rollback()
             logger.error("Database error: %s", str(e))
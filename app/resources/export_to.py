@@ -8,8 +8,36 @@ from the database as a downloadable CSV file through a REST endpoint.
 import io
 import csv
 from flask_restful import Resource
-from flask import make_response
-from app.models import Company
+from flask import Response, stream_with_context
+from sqlalchemy import select
+from app.models import Company, db
+
+# Number of rows fetched from the database cursor at a time.
+EXPORT_BATCH_SIZE = 1000
+
+# Exported columns, in file order; also written as the header row.
+EXPORT_COLUMNS = (
+    "id", "name", "description", "logo_url", "parent_id", "organization_id",
+    "address", "email", "phone_number", "website", "created_at",
+    "updated_at", "is_active", "registration_number", "tax_id", "country",
+    "city", "postal_code", "employees_count",
+)
+
+
+def _drain(output):
+    """
+    Return the CSV text buffered so far and empty the buffer.
+
+    Args:
+        output (io.StringIO): The buffer the CSV writer writes to.
+
+    Returns:
+        str: The buffered CSV text.
+    """
+    value = output.getvalue()
+    output.seek(0)
+    output.truncate()
+    return value
 
 
 class ExportCSVResource(Resource):
@@ -25,49 +53,56 @@ class ExportCSVResource(Resource):
         """
         Export all Company records to a CSV file and return it as a response.
 
+        The file is streamed: rows are read as plain tuples from the database
+        in batches of EXPORT_BATCH_SIZE and each batch is sent as soon as it
+        is formatted.
+
         Returns:
             Response: A CSV file containing all Company records.
         """
-        # Retrieve all Company records
-        companies = Company.get_all()
+        columns = Company.__table__.c
+        statement = select(
+            *(columns[name] for name in EXPORT_COLUMNS)
+        ).execution_options(yield_per=EXPORT_BATCH_SIZE)
 
-        # Prepare CSV in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        # Write header with all fields
-        writer.writerow([
-            "id", "name", "description", "logo_url", "parent_id",
-            "organization_id", "address", "email", "phone_number", "website",
-            "created_at", "updated_at", "is_active", "registration_number",
-            "tax_id", "country", "city", "postal_code", "employees_count"
-        ])
-        # Write data rows
-        for company in companies:
-            writer.writerow([
-                company.id,
-                company.name,
-                company.description,
-                company.logo_url,
-                company.parent_id,
-                company.organization_id,
-                company.address,
-                company.email,
-                company.phone_number,
-                company.website,
-                company.created_at.isoformat() if company.created_at else "",
-                company.updated_at.isoformat() if company.updated_at else "",
-                company.is_active,
-                company.registration_number,
-                company.tax_id,
-                company.country,
-                company.city,
-                company.postal_code,
-                company.employees_count
-            ])
+        def generate():
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(EXPORT_COLUMNS)
+            yield _drain(output)
+            writerows = writer.writerows
+            # Write data rows, one chunk per fetched batch
+            for partition in db.session.execute(statement).partitions():
+                writerows(
+                    (
+                        row.id,
+                        row.name,
+                        row.description,
+                        row.logo_url,
+                        row.parent_id,
+                        row.organization_id,
+                        row.address,
+                        row.email,
+                        row.phone_number,
+                        row.website,
+                        row.created_at.isoformat() if row.created_at else "",
+                        row.updated_at.isoformat() if row.updated_at else "",
+                        row.is_active,
+                        row.registration_number,
+                        row.tax_id,
+                        row.country,
+                        row.city,
+                        row.postal_code,
+                        row.employees_count
+                    )
+                    for row in partition
+                )
+                yield _drain(output)
 
-        # Create response
-        response = make_response(output.getvalue())
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = (
-            'attachment; filename=export.csv')
-        return response
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/csv',
+            headers={
+                'Content-Disposition': 'attachment; filename=export.csv'
+            }
+        )
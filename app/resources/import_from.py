@@ -5,17 +5,33 @@ import.py
 This module defines resources for importing data into the application
 from CSV and JSON files via REST endpoints.
 """
+import codecs
 import csv
-import json
+import orjson
 from flask import request
 from flask_restful import Resource
 from marshmallow import ValidationError
 from sqlalchemy.exc import SQLAlchemyError
-from app.models import Company, db
-from app.schemas import CompanySchema
+from app.bulk import bulk_insert, check_references, company_row
+from app.models import db
+from app.schemas import company_import_schema
 from app.logger import logging
 
-company_schema = CompanySchema(session=db.session)
+
+def import_errors(errors):
+    """
+    Render validation errors as reported by the import endpoints.
+
+    Args:
+        errors (list): {"index", "errors"} dicts built during the import.
+
+    Returns:
+        list: {"index", "error"} dicts, the messages rendered as text.
+    """
+    return [
+        {"index": error['index'], "error": str(error['errors'])}
+        for error in errors
+    ]
 
 
 class ImportJSONResource(Resource):
@@ -49,38 +65,26 @@ class ImportJSONResource(Resource):
             return {"message": "No selected file."}, 400
 
         try:
-            data = json.load(file)
+            data = orjson.loads(file.read())
             if not isinstance(data, list):
                 logging.error("JSON must be a list of objects.")
                 return {"message": "JSON must be a list of objects."}, 400
 
-            count = 0
+            candidates = []
             errors = []
+            seen_names = set()
             for idx, item in enumerate(data):
                 try:
-                    validated = company_schema.load(item)
-                    Company.create(
-                        name=validated.name,
-                        description=validated.description,
-                        logo_url=validated.logo_url,
-                        parent_id=validated.parent_id,
-                        address=validated.address,
-                        email=validated.email,
-                        phone_number=validated.phone_number,
-                        website=validated.website,
-                        registration_number=validated.registration_number,
-                        tax_id=validated.tax_id,
-                        country=validated.country,
-                        city=validated.city,
-                        postal_code=validated.postal_code,
-                        employees_count=validated.employees_count,
+                    validated = company_import_schema.load(item)
+                    candidates.append(
+                        (idx, company_row(validated, seen_names))
                     )
-                    count += 1
                 except ValidationError as e:
-                    logging.error(
-                        f"Validation error at item {idx}: {e.messages}"
-                        )
-                    errors.append({"index": idx, "error": str(e)})
+                    errors.append({"index": idx, "errors": e.messages})
+
+            rows = check_references(candidates, errors)
+            bulk_insert(rows)
+            count = len(rows)
 
             if errors:
                 logging.warning(
@@ -88,11 +92,11 @@ class ImportJSONResource(Resource):
                     )
                 return {
                     "message": f"{count} records imported, {len(errors)} errors.",
-                    "errors": errors
+                    "errors": import_errors(errors)
                 }, 400 if count == 0 else 207  # 207: Multi-Status
 
             return {"message": f"{count} records imported successfully."}, 200
-        except (json.JSONDecodeError, TypeError) as e:
+        except (orjson.JSONDecodeError, TypeError) as e:
             logging.error(f"JSON parsing error: {str(e)}")
             return {"message": f"Invalid JSON file: {str(e)}"}, 400
         except SQLAlchemyError as e:
@@ -132,12 +136,14 @@ class ImportCSVResource(Resource):
             return {"message": "No selected file."}, 400
 
         try:
-            # Read CSV file
-            stream = file.stream.read().decode('utf-8').splitlines()
-            reader = csv.DictReader(stream)
+            # Decode the upload lazily while the CSV rows are read; unlike
+            # io.TextIOWrapper, the codecs reader does not need readable(),
+            # which SpooledTemporaryFile lacks before Python 3.11
+            reader = csv.DictReader(codecs.getreader('utf-8')(file.stream))
 
-            count = 0
+            candidates = []
             errors = []
+            seen_names = set()
             for idx, row in enumerate(reader):
                 try:
                     # Remove fields not accepted by the schema's load method
@@ -150,29 +156,16 @@ class ImportCSVResource(Resource):
                     data.pop('created_at', None)
                     data.pop('updated_at', None)
 
-                    validated = company_schema.load(data)
-                    Company.create(
-                        name=validated.name,
-                        description=validated.description,
-                        logo_url=validated.logo_url,
-                        parent_id=validated.parent_id,
-                        address=validated.address,
-                        email=validated.email,
-                        phone_number=validated.phone_number,
-                        website=validated.website,
-                        registration_number=validated.registration_number,
-                        tax_id=validated.tax_id,
-                        country=validated.country,
-                        city=validated.city,
-                        postal_code=validated.postal_code,
-                        employees_count=validated.employees_count,
+                    validated = company_import_schema.load(data)
+                    candidates.append(
+                        (idx, company_row(validated, seen_names))
                     )
-                    count += 1
                 except ValidationError as e:
-                    logging.error(
-                        f"Validation error at row {idx}: {e.messages}"
-                        )
-                    errors.append({"index": idx, "error": str(e)})
+                    errors.append({"index": idx, "errors": e.messages})
+
+            rows = check_references(candidates, errors)
+            bulk_insert(rows)
+            count = len(rows)
 
             if errors:
                 logging.warning(
@@ -180,7 +173,7 @@ class ImportCSVResource(Resource):
                     )
                 return {
                     "message": f"{count} records imported, {len(errors)} errors.",
-                    "errors": errors
+                    "errors": import_errors(errors)
                 }, 400 if count == 0 else 207  # 207: Multi-Status
 
             return {"message": f"{count} records imported successfully."}, 200
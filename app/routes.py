@@ -7,7 +7,12 @@ Routes for the Flask application.
 """
 from flask_restful import Api
 from app.logger import logger
-from app.resources.companies import CompanyResource, CompanyListResource
+from app.json_provider import output_json
+from app.resources.companies import (
+    CompanyBulkResource,
+    CompanyListResource,
+    CompanyResource,
+)
 from app.resources.version import VersionResource
 from app.resources.config import ConfigResource
 from app.resources.export_to import ExportCSVResource
@@ -26,8 +31,10 @@ def register_routes(app):
     registration of routes.
     """
     api = Api(app)
+    api.representations['application/json'] = output_json
 
     api.add_resource(CompanyListResource, '/companies')
+    api.add_resource(CompanyBulkResource, '/companies/bulk')
     api.add_resource(CompanyResource, '/companies/<string:company_id>')
     api.add_resource(ExportCSVResource, '/export/csv')
     api.add_resource(ImportCSVResource, '/import/csv')
@@ -3,371 +3,386 @@ schemas.py
 ----------
 
 This module defines Marshmallow schemas for serializing and validating
-the application's data models.
+the application's data models, and the schema instances shared by the
+resources. Schema instances are built once per set of options by
+get_schema() and reused by every request.
 """
 
-from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
+from contextlib import contextmanager
+from copy import deepcopy
+from functools import lru_cache
+from threading import Lock
+
+from flask import current_app, g
+from marshmallow_sqlalchemy import SQLAlchemyAutoSchema, auto_field
 from marshmallow import ValidationError, validates
+from marshmallow.validate import Length, Range, Validator
 
-from .models import Company
-from .logger import logger
+from .models import Company, canonical_id
 
 
-class CompanySchema(SQLAlchemyAutoSchema):
+# Accepted URL prefixes, shared by the URL fields.
+_URL_PREFIXES = ('http://', 'https://')
+
+
+class _URLScheme(Validator):
     """
-    Serialization and validation schema for the Company model.
+    Validator accepting strings that start with one of _URL_PREFIXES.
 
-    This schema is used to serialize and validate Company objects,
-    ensuring that all fields conform to the expected format and constraints.
+    A plain str.startswith() on the module constant, cheaper than matching
+    a regular expression. Empty strings are accepted.
     """
-    class Meta:
-        """
-        Meta options for the Company schema.
 
-        Attributes:
-            model (db.Model): The SQLAlchemy model associated with this schema.
-            load_instance (bool): Whether to load model instances.
-            include_fk (bool): Whether to include foreign keys.
-            dump_only (tuple): Fields that are only used for serialization.
-        """
-        model = Company
-        load_instance = True
-        include_fk = True
-        dump_only = ('id', 'created_at', 'updated_at')
+    def __init__(self, *, error):
+        self.error = error
 
-    @validates('name')
-    def validate_name(self, value, **kwargs):
-        """
-        Validate that the name is not empty, unique, and does not exceed 100
-        characters.
+    def __call__(self, value):
+        if value and not value.startswith(_URL_PREFIXES):
+            raise ValidationError(self.error)
+        return value
 
-        Args:
-            value (str): The name to validate.
 
-        Raises:
-            ValidationError: If the name is empty, already exists, or exceeds
-            100 characters.
+class _EmailAddress(Validator):
+    """
+    Validator accepting strings that contain an '@'.
 
-        Returns:
-            str: The validated name.
-        """
-        _ = kwargs
+    Empty strings are accepted.
+    """
 
-        if not value:
-            logger.error("Validation error: Name cannot be empty.")
-            raise ValidationError("Name cannot be empty.")
-        company = Company.get_by_name(value)
-        if company:
-            logger.error("Validation error: Name %s already exists.", value)
-            raise ValidationError("Name must be unique.")
-        if len(value) > 100:
-            logger.error("Validation error: Name exceeds 100 characters.")
-            raise ValidationError("Name cannot exceed 100 characters.")
-        return value
+    def __init__(self, *, error):
+        self.error = error
 
-    @validates('description')
-    def validate_description(self, value, **kwargs):
-        """
-        Validate that the description does not exceed 500 characters.
+    def __call__(self, value):
+        if value and '@' not in value:
+            raise ValidationError(self.error)
+        return value
 
-        Args:
-            value (str): The description to validate.
 
-        Raises:
-            ValidationError: If the description exceeds 500 characters.
+@contextmanager
+def preloaded_references(data):
+    """
+    Preload the companies a payload refers to for the validators.
 
-        Returns:
-            str: The validated description.
-        """
-        _ = kwargs
-        if value and len(value) > 500:
-            logger.error(
-                "Validation error: Description exceeds 500 characters."
-            )
-            raise ValidationError("Description cannot exceed 500 characters.")
-        return value
+    The companies matching the payload 'name' (uniqueness check) and
+    'parent_id' (existence check) are fetched in a single query and kept on
+    flask.g while the context is active, so that validating the payload does
+    not issue one query per check.
 
-    @validates('logo_url')
-    def validate_logo_url(self, value, **kwargs):
-        """
-        Validate that the logo URL is a valid URL and does not exceed 255
-        characters.
+    Args:
+        data (dict): The payload about to be loaded by a CompanySchema.
+    """
+    if not isinstance(data, dict):
+        yield
+        return
+    rows = Company.get_references(data.get('name'), data.get('parent_id'))
+    g.company_references = {
+        'names': {row.name for row in rows},
+        'ids': {row.id for row in rows},
+    }
+    try:
+        yield
+    finally:
+        g.pop('company_references', None)
+
+
+def _payload_key(data):
+    """
+    Build a hashable key identifying a payload.
 
-        Args:
-            value (str): The logo URL to validate.
+    Value types are part of the key so that, for instance, 1 and True are
+    not mistaken for one another.
 
-        Raises:
-            ValidationError: If the logo URL is not a valid URL or exceeds 255
-            characters.
+    Args:
+        data (dict): The payload.
 
-        Returns:
-            str: The validated logo URL.
-        """
-        _ = kwargs
-        if value and not value.startswith(('http://', 'https://')):
-            logger.error("Validation error: Logo URL must be a valid URL.")
-            raise ValidationError("Logo URL must be a valid URL.")
-        if value and len(value) > 255:
-            logger.error("Validation error: Logo URL exceeds 255 characters.")
-            raise ValidationError("Logo URL cannot exceed 255 characters.")
+    Raises:
+        TypeError: If a value is not hashable (nested lists or objects).
 
-        return value
+    Returns:
+        tuple: The sorted (field, type, value) triples of the payload.
+    """
+    key = tuple(
+        sorted((field, type(value), value) for field, value in data.items())
+    )
+    hash(key)
+    return key
 
-    @validates('parent_id')
-    def validate_parent_id(self, value, **kwargs):
-        """
-        Validate that the parent ID is a valid string and exists in the
-        database.
 
-        Args:
-            value (str): The parent ID to validate.
+@lru_cache(maxsize=128)
+def _validation_errors(schema, payload, name_taken, parent_exists):
+    """
+    Validate a payload and return the error messages, memoized.
 
-        Raises:
-            ValidationError: If the parent ID is not a string or does not
-            exist.
+    The outcome of a validation depends on the payload and, through the
+    database checks, on whether its name is taken and its parent exists;
+    those two flags are only passed to be part of the cache key.
 
-        Returns:
-            str: The validated parent ID.
-        """
-        _ = kwargs
-        if value:
-            if not isinstance(value, str):
-                logger.error(
-                    "Validation error: Parent ID must be a valid id or None."
-                )
-                raise ValidationError(
-                    "Parent ID must be a valid string or None."
-                )
-            parent = Company.get_by_id(value)
-            if parent is None:
-                logger.error(
-                    "Validation error: Parent ID %s does not exist.",
-                    value
-                )
-                raise ValidationError("Parent company does not exist.")
-        return value
+    Args:
+        schema (CompanySchema): The schema to validate with.
+        payload (tuple): The payload key built by _payload_key().
+        name_taken (bool): Whether the payload name is already used.
+        parent_exists (bool): Whether the payload parent exists.
 
-    @validates('address')
-    def validate_address(self, value, **kwargs):
-        """
-        Validate that the address does not exceed 255 characters.
+    Returns:
+        dict: The validation error messages, or None if the payload is valid.
+    """
+    _ = name_taken, parent_exists
+    try:
+        schema.load({field: value for field, _type, value in payload})
+    except ValidationError as err:
+        return err.messages
+    return None
 
-        Args:
-            value (str): The address to validate.
 
-        Raises:
-            ValidationError: If the address exceeds 255 characters.
+def cached_validate(schema, data):
+    """
+    Validate a payload, reusing the outcome of an identical validation.
 
-        Returns:
-            str: The validated address.
-        """
-        _ = kwargs
-        if value and len(value) > 255:
-            logger.error("Validation error: Address exceeds 255 characters.")
-            raise ValidationError("Address cannot exceed 255 characters.")
-        return value
+    Enabled by the VALIDATION_CACHE setting, as it trades memory for CPU:
+    the outcome of the last 128 distinct validations is kept, keyed on the
+    schema, the payload and the preloaded database references. Without the
+    setting, outside of preloaded_references() or for payloads that cannot
+    be hashed, the payload is validated by schema.load().
 
-    @validates('email')
-    def validate_email(self, value, **kwargs):
-        """
-        Validate that the email is a valid email format and does not exceed 100
-        characters.
+    Args:
+        schema (CompanySchema): The schema to validate with.
+        data (dict): The payload to validate.
 
-        Args:
-            value (str): The email to validate.
+    Raises:
+        ValidationError: If the payload is invalid.
+    """
+    references = g.get('company_references')
+    if (not current_app.config.get('VALIDATION_CACHE')
+            or references is None or not isinstance(data, dict)):
+        schema.load(data)
+        return
+    try:
+        payload = _payload_key(data)
+    except TypeError:
+        schema.load(data)
+        return
+    errors = _validation_errors(
+        schema,
+        payload,
+        data.get('name') in references['names'],
+        canonical_id(data.get('parent_id')) in references['ids'],
+    )
+    if errors is not None:
+        raise ValidationError(deepcopy(errors))
 
-        Raises:
-            ValidationError: If the email is not a valid format or exceeds 100
-            characters.
 
-        Returns:
-            str: The validated email.
-        """
-        _ = kwargs
-        if value and len(value) > 100:
-            logger.error("Validation error: Email exceeds 100 characters.")
-            raise ValidationError("Email cannot exceed 100 characters.")
-        if value and '@' not in value:
-            logger.error(
-                "Validation error: Email must be a valid email address."
-            )
-            raise ValidationError("Email must be a valid email address.")
-        return value
+class CompanySchema(SQLAlchemyAutoSchema):
+    """
+    Serialization and validation schema for the Company model.
 
-    @validates('phone_number')
-    def validate_phone_number(self, value, **kwargs):
+    This schema is used to serialize and validate Company objects,
+    ensuring that all fields conform to the expected format and constraints.
+    """
+    class Meta:
         """
-        Validate that the phone number does not exceed 20 characters.
-
-        Args:
-            value (str): The phone number to validate.
-
-        Raises:
-            ValidationError: If the phone number exceeds 20 characters.
+        Meta options for the Company schema.
 
-        Returns:
-            str: The validated phone number.
+        Attributes:
+            model (db.Model): The SQLAlchemy model associated with this schema.
+            load_instance (bool): Whether to load model instances; off, as
+                payloads are only validated and applied through the model.
+            include_fk (bool): Whether to include foreign keys.
+            dump_only (tuple): Fields that are only used for serialization.
         """
-        _ = kwargs
-        if value and len(value) > 20:
-            logger.error(
-                "Validation error: Phone number exceeds 20 characters."
-            )
-            raise ValidationError("Phone number cannot exceed 20 characters.")
-        return value
+        model = Company
+        load_instance = False
+        include_fk = True
+        dump_only = ('id', 'created_at', 'updated_at')
 
-    @validates('website')
-    def validate_website(self, value, **kwargs):
+    # Format and size constraints are declared on the fields so marshmallow
+    # applies them while deserializing; only the checks that need the
+    # database are written as @validates methods below.
+    name = auto_field(validate=[
+        Length(min=1, error="Name cannot be empty."),
+        Length(max=100, error="Name cannot exceed 100 characters."),
+    ])
+    description = auto_field(validate=Length(
+        max=500, error="Description cannot exceed 500 characters."
+    ))
+    logo_url = auto_field(validate=[
+        _URLScheme(error="Logo URL must be a valid URL."),
+        Length(max=255, error="Logo URL cannot exceed 255 characters."),
+    ])
+    address = auto_field(validate=Length(
+        max=255, error="Address cannot exceed 255 characters."
+    ))
+    email = auto_field(validate=[
+        Length(max=100, error="Email cannot exceed 100 characters."),
+        _EmailAddress(error="Email must be a valid email address."),
+    ])
+    phone_number = auto_field(validate=Length(
+        max=20, error="Phone number cannot exceed 20 characters."
+    ))
+    website = auto_field(validate=[
+        _URLScheme(error="Website must be a valid URL."),
+        Length(max=100, error="Website cannot exceed 100 characters."),
+    ])
+    registration_number = auto_field(validate=Length(
+        max=100, error="Registration number cannot exceed 100 characters."
+    ))
+    tax_id = auto_field(validate=Length(
+        max=50, error="Tax ID cannot exceed 50 characters."
+    ))
+    country = auto_field(validate=Length(
+        max=100, error="Country cannot exceed 100 characters."
+    ))
+    city = auto_field(validate=Length(
+        max=100, error="City cannot exceed 100 characters."
+    ))
+    postal_code = auto_field(validate=Length(
+        max=20, error="Postal code cannot exceed 20 characters."
+    ))
+    employees_count = auto_field(validate=Range(
+        min=0, error="Employees count must be a non-negative integer."
+    ))
+
+    def __init__(self, *args, db_checks=True, **kwargs):
         """
-        Validate that the website is a valid URL and does not exceed 100
-        characters.
+        Initialize the schema.
 
         Args:
-            value (str): The website to validate.
-
-        Raises:
-            ValidationError: If the website is not a valid URL or exceeds 100
-            characters.
-
-        Returns:
-            str: The validated website.
+            db_checks (bool, optional): Whether the validators query the
+                database for name uniqueness and parent existence. Bulk
+                callers disable it and check all the records at once.
         """
-        _ = kwargs
-        if value and not value.startswith(('http://', 'https://')):
-            logger.error("Validation error: Website must be a valid URL.")
-            raise ValidationError("Website must be a valid URL.")
-        if value and len(value) > 100:
-            logger.error("Validation error: Website exceeds 100 characters.")
-            raise ValidationError("Website cannot exceed 100 characters.")
-        return value
+        super().__init__(*args, **kwargs)
+        self.db_checks = db_checks
 
-    @validates('registration_number')
-    def validate_registration_number(self, value, **kwargs):
+    @staticmethod
+    def _name_taken(name):
         """
-        Validate that the registration number does not exceed 100 characters.
+        Tell whether a company already uses the given name.
 
         Args:
-            value (str): The registration number to validate.
-
-        Raises:
-            ValidationError: If the registration number exceeds 100 characters.
+            name (str): The name to look for.
 
         Returns:
-            str: The validated registration number.
+            bool: True if the name is taken.
         """
-        _ = kwargs
-        if value and len(value) > 100:
-            logger.error(
-                "Validation error: Registration number exceeds 100 characters."
-            )
-            raise ValidationError(
-                "Registration number cannot exceed 100 characters."
-            )
-        return value
+        references = g.get('company_references')
+        if references is not None:
+            return name in references['names']
+        return Company.name_exists(name)
 
-    @validates('tax_id')
-    def validate_tax_id(self, value, **kwargs):
+    @staticmethod
+    def _company_exists(company_id):
         """
-        Validate that the tax ID does not exceed 50 characters.
+        Tell whether a company with the given ID exists.
 
         Args:
-            value (str): The tax ID to validate.
-
-        Raises:
-            ValidationError: If the tax ID exceeds 50 characters.
+            company_id (str): The ID to look for.
 
         Returns:
-            str: The validated tax ID.
+            bool: True if the company exists.
         """
-        _ = kwargs
-        if value and len(value) > 50:
-            logger.error("Validation error: Tax ID exceeds 50 characters.")
-            raise ValidationError("Tax ID cannot exceed 50 characters.")
-        return value
+        references = g.get('company_references')
+        if references is not None:
+            return canonical_id(company_id) in references['ids']
+        return Company.id_exists(company_id)
 
-    @validates('country')
-    def validate_country(self, value, **kwargs):
+    @validates('name')
+    def validate_name(self, value, data_key):
         """
-        Validate that the country does not exceed 100 characters.
+        Validate that the name is not already used by another company.
 
         Args:
-            value (str): The country to validate.
+            value (str): The name to validate.
+            data_key (str): Key of the field in the input data, always
+                passed by marshmallow; unused.
 
         Raises:
-            ValidationError: If the country exceeds 100 characters.
+            ValidationError: If the name already exists.
 
         Returns:
-            str: The validated country.
+            str: The validated name.
         """
-        _ = kwargs
-        if value and len(value) > 100:
-            logger.error("Validation error: Country exceeds 100 characters.")
-            raise ValidationError("Country cannot exceed 100 characters.")
+        if self.db_checks and self._name_taken(value):
+            raise ValidationError("Name must be unique.")
         return value
 
-    @validates('city')
-    def validate_city(self, value, **kwargs):
+    @validates('parent_id')
+    def validate_parent_id(self, value, data_key):
         """
-        Validate that the city does not exceed 100 characters.
+        Validate that the parent ID is a valid UUID of an existing company.
+
+        The type and UUID shape are checked first, so a malformed parent ID
+        is rejected without querying the database.
 
         Args:
-            value (str): The city to validate.
+            value (str): The parent ID to validate.
+            data_key (str): Key of the field in the input data, always
+                passed by marshmallow; unused.
 
         Raises:
-            ValidationError: If the city exceeds 100 characters.
+            ValidationError: If the parent ID is not a string, not a valid
+            UUID or does not exist.
 
         Returns:
-            str: The validated city.
+            str: The validated parent ID.
         """
-        _ = kwargs
-        if value and len(value) > 100:
-            logger.error("Validation error: City exceeds 100 characters.")
-            raise ValidationError("City cannot exceed 100 characters.")
+        if not value:
+            return value
+        if not isinstance(value, str):
+            raise ValidationError("Parent ID must be a valid string or None.")
+        if canonical_id(value) is None:
+            raise ValidationError("Parent ID must be a valid UUID.")
+        if self.db_checks and not self._company_exists(value):
+            raise ValidationError("Parent company does not exist.")
         return value
 
-    @validates('postal_code')
-    def validate_postal_code(self, value, **kwargs):
-        """
-        Validate that the postal code does not exceed 20 characters.
 
-        Args:
-            value (str): The postal code to validate.
+# Schema instances shared by all requests, keyed by their options.
+_SCHEMA_POOL = {}
+_SCHEMA_POOL_LOCK = Lock()
 
-        Raises:
-            ValidationError: If the postal code exceeds 20 characters.
 
-        Returns:
-            str: The validated postal code.
-        """
-        _ = kwargs
-        if value and len(value) > 20:
-            logger.error(
-                "Validation error: Postal code exceeds 20 characters."
-            )
-            raise ValidationError("Postal code cannot exceed 20 characters.")
-        return value
+def get_schema(partial=False, only=None, exclude=None, db_checks=True):
+    """
+    Return the shared CompanySchema instance for the given options.
 
-    @validates('employees_count')
-    def validate_employees_count(self, value, **kwargs):
-        """
-        Validate that the employees count is a non-negative integer.
+    Building an auto schema copies and binds all its fields, so each set of
+    options is built once per process and reused by every request.
 
-        Args:
-            value (int): The employees count to validate.
+    Args:
+        partial (bool, optional): Whether missing fields are allowed.
+        only (iterable, optional): Names of the only fields to include.
+        exclude (iterable, optional): Names of the fields to leave out.
+        db_checks (bool, optional): Whether the validators query the
+            database; see CompanySchema.
 
-        Raises:
-            ValidationError: If the employees count is not a non-negative
-            integer.
+    Returns:
+        CompanySchema: The shared schema instance.
+    """
+    key = (
+        partial,
+        frozenset(only) if only is not None else None,
+        frozenset(exclude or ()),
+        db_checks,
+    )
+    schema = _SCHEMA_POOL.get(key)
+    if schema is None:
+        with _SCHEMA_POOL_LOCK:
+            schema = _SCHEMA_POOL.get(key)
+            if schema is None:
+                schema = CompanySchema(
+                    partial=partial,
+                    only=only,
+                    exclude=exclude or (),
+                    db_checks=db_checks,
+                )
+                _SCHEMA_POOL[key] = schema
+    return schema
 
-        Returns:
-            int: The validated employees count.
-        """
-        _ = kwargs
-        if value is not None and (not isinstance(value, int) or value < 0):
-            logger.error(
-                "Validation error: Employees count must be positive integer."
-            )
-            raise ValidationError(
-                "Employees count must be a non-negative integer."
-            )
-        return value
+
+company_schema = get_schema()
+company_schema_partial = get_schema(partial=True)
+# Serialization uses the same instance as validation.
+company_dump_schema = company_schema
+# Validation-only schema for imports: the name and parent checks are done
+# for the whole file at once.
+company_import_schema = get_schema(db_checks=False)
@@ -0,0 +1,51 @@
+"""unique company names
+
+Revision ID: 5e1f9c3b72a4
+Revises: d2b7f5e8a614
+Create Date: 2026-10-15 11:47:05.262918
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1f9c3b72a4'
+down_revision = 'd2b7f5e8a614'
+branch_labels = None
+depends_on = None
+
+
+def replace_name_index(unique):
+    # The new index is built under a temporary name before the old one is
+    # dropped, so name lookups stay indexed throughout. If the build fails
+    # (duplicate names when adding uniqueness), the old index is untouched;
+    # on PostgreSQL the invalid temporary index has to be dropped before
+    # retrying.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_companies_name_tmp', 'companies', ['name'],
+            unique=unique, postgresql_concurrently=True
+        )
+        op.drop_index(
+            op.f('ix_companies_name'), table_name='companies',
+            postgresql_concurrently=True
+        )
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            'ALTER INDEX ix_companies_name_tmp RENAME TO ix_companies_name'
+        )
+    else:
+        # Other backends cannot rename an index: it is built again under
+        # its final name, the temporary one covering lookups meanwhile.
+        op.create_index(
+            op.f('ix_companies_name'), 'companies', ['name'], unique=unique
+        )
+        op.drop_index('ix_companies_name_tmp', table_name='companies')
+
+
+def upgrade():
+    replace_name_index(unique=True)
+
+
+def downgrade():
+    replace_name_index(unique=False)
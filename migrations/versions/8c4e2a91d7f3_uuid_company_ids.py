@@ -0,0 +1,98 @@
+"""uuid company ids
+
+Revision ID: 8c4e2a91d7f3
+Revises: 33df172e487c
+Create Date: 2026-10-15 09:12:41.530127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4e2a91d7f3'
+down_revision = '33df172e487c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        # Native 16 bytes UUID columns; the foreign key has to be dropped
+        # while both sides change type.
+        op.drop_constraint(
+            'companies_parent_id_fkey', 'companies', type_='foreignkey'
+        )
+        op.alter_column(
+            'companies', 'parent_id',
+            existing_type=sa.String(length=100),
+            type_=sa.Uuid(),
+            postgresql_using='parent_id::uuid'
+        )
+        op.alter_column(
+            'companies', 'id',
+            existing_type=sa.String(length=40),
+            type_=sa.Uuid(),
+            postgresql_using='id::uuid'
+        )
+        op.create_foreign_key(
+            'companies_parent_id_fkey', 'companies', 'companies',
+            ['parent_id'], ['id']
+        )
+    else:
+        # Other backends store UUIDs as 32 hexadecimal characters.
+        op.execute(
+            "UPDATE companies SET id = REPLACE(id, '-', ''), "
+            "parent_id = REPLACE(parent_id, '-', '')"
+        )
+        with op.batch_alter_table('companies') as batch_op:
+            batch_op.alter_column(
+                'id', existing_type=sa.String(length=40), type_=sa.Uuid()
+            )
+            batch_op.alter_column(
+                'parent_id',
+                existing_type=sa.String(length=100),
+                type_=sa.Uuid()
+            )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_constraint(
+            'companies_parent_id_fkey', 'companies', type_='foreignkey'
+        )
+        op.alter_column(
+            'companies', 'id',
+            existing_type=sa.Uuid(),
+            type_=sa.String(length=40),
+            postgresql_using='id::text'
+        )
+        op.alter_column(
+            'companies', 'parent_id',
+            existing_type=sa.Uuid(),
+            type_=sa.String(length=100),
+            postgresql_using='parent_id::text'
+        )
+        op.create_foreign_key(
+            'companies_parent_id_fkey', 'companies', 'companies',
+            ['parent_id'], ['id']
+        )
+    else:
+        with op.batch_alter_table('companies') as batch_op:
+            batch_op.alter_column(
+                'id', existing_type=sa.Uuid(), type_=sa.String(length=40)
+            )
+            batch_op.alter_column(
+                'parent_id',
+                existing_type=sa.Uuid(),
+                type_=sa.String(length=100)
+            )
+        op.execute(
+            "UPDATE companies SET "
+            "id = LOWER(SUBSTR(id, 1, 8) || '-' || SUBSTR(id, 9, 4) || '-' || "
+            "SUBSTR(id, 13, 4) || '-' || SUBSTR(id, 17, 4) || '-' || "
+            "SUBSTR(id, 21)), "
+            "parent_id = LOWER(SUBSTR(parent_id, 1, 8) || '-' || "
+            "SUBSTR(parent_id, 9, 4) || '-' || SUBSTR(parent_id, 13, 4) || "
+            "'-' || SUBSTR(parent_id, 17, 4) || '-' || SUBSTR(parent_id, 21))"
+        )
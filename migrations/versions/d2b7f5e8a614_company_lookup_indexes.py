@@ -0,0 +1,57 @@
+"""company lookup indexes
+
+Revision ID: d2b7f5e8a614
+Revises: 8c4e2a91d7f3
+Create Date: 2026-10-15 10:03:27.914385
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2b7f5e8a614'
+down_revision = '8c4e2a91d7f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction on
+    # PostgreSQL; it avoids locking the table against writes while building.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f('ix_companies_name'), 'companies', ['name'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            op.f('ix_companies_organization_id'), 'companies',
+            ['organization_id'], unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            op.f('ix_companies_parent_id'), 'companies', ['parent_id'],
+            unique=False, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_companies_country_city', 'companies', ['country', 'city'],
+            unique=False, postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_companies_country_city', table_name='companies',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            op.f('ix_companies_parent_id'), table_name='companies',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            op.f('ix_companies_organization_id'), table_name='companies',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            op.f('ix_companies_name'), table_name='companies',
+            postgresql_concurrently=True
+        )
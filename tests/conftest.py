@@ -11,24 +11,38 @@ load_dotenv(dotenv_path=os.path.join(os.path.dirname(__file__), '..', '.env.test
 from app import create_app
 from app.models import db
 
-@fixture
+@fixture(scope="module")
 def app():
     """
     Fixture to create and configure a Flask application for testing.
-    This fixture sets up the application context, initializes the database,
-    and ensures that the database is created before tests run and dropped after tests complete.
+    The application and its database schema are created once per test module
+    and dropped once all the tests of the module have run; the tables are
+    emptied after each test by the client and session fixtures.
     """
     app = create_app('app.config.TestingConfig')
     with app.app_context():
         db.create_all()
         yield app
+        db.session.remove()
         db.drop_all()
 
+def empty_tables():
+    """
+    Discard the session state and delete the rows left by a test.
+    """
+    db.session.rollback()
+    for table in reversed(db.metadata.sorted_tables):
+        db.session.execute(table.delete())
+    db.session.commit()
+    db.session.remove()
+
 @fixture
 def client(app):
-    return app.test_client()
+    yield app.test_client()
+    empty_tables()
 
 @fixture
 def session(app):
     with app.app_context():
         yield db.session
+    empty_tables()
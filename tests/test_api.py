@@ -1,7 +1,15 @@
-import json
+import logging
+from sqlalchemy import event
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from app.models import Company, db
 from app.resources.companies import CompanyListResource
+from app.schemas import (
+    CompanySchema,
+    company_import_schema,
+    company_schema,
+    company_schema_partial,
+    get_schema,
+)
 
 
 def test_get_companies_empty(client):
@@ -21,7 +29,7 @@ def test_post_company_valid(client):
         "email": "test@example.com",
         "employees_count": 10
     }
-    response = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    response = client.post("/companies", json=data)
     assert response.status_code == 201
     assert response.json["name"] == "Test Company"
     assert response.json["description"] == "A test company"
@@ -33,7 +41,7 @@ def test_post_company_missing_name(client):
     data = {
         "description": "No name"
     }
-    response = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    response = client.post("/companies", json=data)
     assert response.status_code == 400
     assert "errors" in response.json
     assert "name" in response.json["errors"]
@@ -44,7 +52,7 @@ def test_post_company_name_too_long(client):
         "name": "A" * 101,
         "description": "Too long name"
     }
-    response = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    response = client.post("/companies", json=data)
     assert response.status_code == 400
     assert "errors" in response.json
     assert "name" in response.json["errors"]
@@ -55,10 +63,10 @@ def test_post_company_duplicate_name(client):
         "name": "UniqueName"
     }
     # First insert
-    response1 = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    response1 = client.post("/companies", json=data)
     assert response1.status_code == 201
     # Duplicate insert
-    response2 = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    response2 = client.post("/companies", json=data)
     assert response2.status_code == 400
     assert "errors" in response2.json
     assert "name" in response2.json["errors"]
@@ -69,7 +77,7 @@ def test_post_company_invalid_email(client):
         "name": "EmailTest",
         "email": "not-an-email"
     }
-    response = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    response = client.post("/companies", json=data)
     assert response.status_code == 400
     assert "errors" in response.json
     assert "email" in response.json["errors"]
@@ -80,7 +88,7 @@ def test_post_company_employees_count_negative(client):
         "name": "NegativeCount",
         "employees_count": -5
     }
-    response = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    response = client.post("/companies", json=data)
     assert response.status_code == 400
     assert "errors" in response.json
     assert "employees_count" in response.json["errors"]
@@ -90,7 +98,7 @@ def test_get_companies_with_one(client):
     data = {
         "name": "ListedCompany"
     }
-    client.post("/companies", data=json.dumps(data), content_type="application/json")
+    client.post("/companies", json=data)
     response = client.get("/companies")
     assert response.status_code == 200
     assert any(c["name"] == "ListedCompany" for c in response.json)
@@ -130,7 +138,7 @@ def test_get_company_found(client):
     """GET /companies/<id> should return the company if it exists."""
     # Create a company first
     data = {"name": "FindMe"}
-    post_resp = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    post_resp = client.post("/companies", json=data)
     company_id = post_resp.json["id"]
     response = client.get(f"/companies/{company_id}")
     assert response.status_code == 200
@@ -139,7 +147,7 @@ def test_get_company_found(client):
 def test_put_company_not_found(client):
     """PUT /companies/<id> with unknown id should return 404."""
     data = {"name": "Updated"}
-    response = client.put("/companies/unknown-id", data=json.dumps(data), content_type="application/json")
+    response = client.put("/companies/unknown-id", json=data)
     assert response.status_code == 404
     assert response.json["message"] == "Company not found"
 
@@ -147,10 +155,10 @@ def test_put_company_invalid(client):
     """PUT /companies/<id> with invalid data should return 400."""
     # Create a company
     data = {"name": "PutTest"}
-    post_resp = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    post_resp = client.post("/companies", json=data)
     company_id = post_resp.json["id"]
     # Now send invalid data (missing name)
-    response = client.put(f"/companies/{company_id}", data=json.dumps({}), content_type="application/json")
+    response = client.put(f"/companies/{company_id}", json={})
     assert response.status_code == 400
     assert "errors" in response.json
     assert "name" in response.json["errors"]
@@ -158,10 +166,10 @@ def test_put_company_invalid(client):
 def test_put_company_valid(client):
     """PUT /companies/<id> with valid data should update the company."""
     data = {"name": "PutMe"}
-    post_resp = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    post_resp = client.post("/companies", json=data)
     company_id = post_resp.json["id"]
     update = {"name": "PutMeUpdated", "description": "Updated desc"}
-    response = client.put(f"/companies/{company_id}", data=json.dumps(update), content_type="application/json")
+    response = client.put(f"/companies/{company_id}", json=update)
     assert response.status_code == 200
     assert response.json["name"] == "PutMeUpdated"
     assert response.json["description"] == "Updated desc"
@@ -173,6 +181,7 @@ def test_update_integrity_error(client, monkeypatch):
 
     # First, create an object to update
     company = Company.create(name='Test Dummy', description='A test dummy')
+    db.session.commit()
 
     # Monkeypatch commit method
     monkeypatch.setattr("app.models.db.session.commit", raise_integrity_error)
@@ -188,6 +197,7 @@ def test_update_sqlalchemy_error(client, monkeypatch):
 
     # First, create an object to update
     company = Company.create(name='Test Dummy', description='A test dummy')
+    db.session.commit()
 
     monkeypatch.setattr("app.models.db.session.commit", raise_sqlalchemy_error)
 
@@ -197,16 +207,16 @@ def test_update_sqlalchemy_error(client, monkeypatch):
 
 def test_patch_company_not_found(client):
     """PATCH /companies/<id> with unknown id should return 404."""
-    response = client.patch("/companies/unknown-id", data=json.dumps({"name": "X"}), content_type="application/json")
+    response = client.patch("/companies/unknown-id", json={"name": "X"})
     assert response.status_code == 404
 
 def test_patch_company_invalid(client):
     """PATCH /companies/<id> with invalid data should return 400."""
     data = {"name": "PatchTest"}
-    post_resp = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    post_resp = client.post("/companies", json=data)
     company_id = post_resp.json["id"]
     # Invalid: name too long
-    response = client.patch(f"/companies/{company_id}", data=json.dumps({"name": "A"*101}), content_type="application/json")
+    response = client.patch(f"/companies/{company_id}", json={"name": "A"*101})
     assert response.status_code == 400
     assert "errors" in response.json
     assert "name" in response.json["errors"]
@@ -214,10 +224,10 @@ def test_patch_company_invalid(client):
 def test_patch_company_valid(client):
     """PATCH /companies/<id> with valid data should update the company."""
     data = {"name": "PatchMe"}
-    post_resp = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    post_resp = client.post("/companies", json=data)
     company_id = post_resp.json["id"]
     patch = {"description": "Patched desc"}
-    response = client.patch(f"/companies/{company_id}", data=json.dumps(patch), content_type="application/json")
+    response = client.patch(f"/companies/{company_id}", json=patch)
     assert response.status_code == 200
     assert response.json["description"] == "Patched desc"
 
@@ -242,7 +252,7 @@ def test_patch_company_all_fields(client):
         "organization_id": "org1",
         "parent_id": None
     }
-    post_resp = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    post_resp = client.post("/companies", json=data)
     company_id = post_resp.json["id"]
 
     # Patch each field one by one and check the update
@@ -267,7 +277,7 @@ def test_patch_company_all_fields(client):
 
     for field, value in patch_fields.items():
         patch_data = {field: value}
-        response = client.patch(f"/companies/{company_id}", data=json.dumps(patch_data), content_type="application/json")
+        response = client.patch(f"/companies/{company_id}", json=patch_data)
         assert response.status_code == 200
         assert response.json[field] == value
 
@@ -278,6 +288,7 @@ def test_partial_update_integrity_error(client, monkeypatch):
 
     # First, create an object to update
     company = Company.create(name='Test Dummy', description='A test dummy')
+    db.session.commit()
 
     # Monkeypatch commit method
     monkeypatch.setattr("app.models.db.session.commit", raise_integrity_error)
@@ -293,6 +304,7 @@ def test_partial_update_sqlalchemy_error(client, monkeypatch):
 
     # First, create an object to update
     company = Company.create(name='Test Dummy', description='A test dummy')
+    db.session.commit()
 
     monkeypatch.setattr("app.models.db.session.commit", raise_sqlalchemy_error)
 
@@ -308,7 +320,7 @@ def test_delete_company_not_found(client):
 def test_delete_company_success(client):
     """DELETE /companies/<id> should delete the company."""
     data = {"name": "DeleteMe"}
-    post_resp = client.post("/companies", data=json.dumps(data), content_type="application/json")
+    post_resp = client.post("/companies", json=data)
     company_id = post_resp.json["id"]
     response = client.delete(f"/companies/{company_id}")
     assert response.status_code == 204
@@ -323,12 +335,274 @@ def test_delete_sqlalchemy_error(client, monkeypatch):
 
     # First, create a dummy object to delete
     company = Company.create(name='Test Dummy', description='A test dummy')
+    db.session.commit()
 
     monkeypatch.setattr("app.models.db.session.commit", raise_sqlalchemy_error)
 
     response = client.delete(f'/companies/{company.id}')
     assert response.status_code == 500
-    data = json.loads(response.data)
+    data = response.json
     assert 'message' in data
     assert 'error' in data
     assert data['message'] == 'Database error'
+
+#
+# Test for GET /companies pagination
+#
+def test_get_companies_paginated(client):
+    """GET /companies should honour limit/offset and link adjacent pages."""
+    for i in range(3):
+        client.post("/companies", json={"name": f"Paged {i}"})
+    first = client.get("/companies?limit=2")
+    assert first.status_code == 200
+    assert len(first.json) == 2
+    assert 'offset=2>; rel="next"' in first.headers["Link"]
+    second = client.get("/companies?limit=2&offset=2")
+    assert len(second.json) == 1
+    assert 'rel="next"' not in second.headers["Link"]
+    assert 'offset=0>; rel="prev"' in second.headers["Link"]
+    names = {c["name"] for c in first.json + second.json}
+    assert names == {"Paged 0", "Paged 1", "Paged 2"}
+
+def test_get_companies_limit_capped(client, monkeypatch):
+    """GET /companies should never return more than MAX_PAGE_SIZE items."""
+    monkeypatch.setattr("app.resources.companies.MAX_PAGE_SIZE", 1)
+    for i in range(2):
+        client.post("/companies", json={"name": f"Capped {i}"})
+    response = client.get("/companies?limit=50")
+    assert response.status_code == 200
+    assert len(response.json) == 1
+
+def test_get_companies_invalid_pagination(client):
+    """GET /companies with invalid pagination parameters should fail."""
+    assert client.get("/companies?limit=abc").status_code == 400
+    assert client.get("/companies?limit=0").status_code == 400
+    assert client.get("/companies?offset=-1").status_code == 400
+
+def test_get_companies_matches_schema_dump(client):
+    """GET /companies items should have the same format as GET /companies/<id>."""
+    data = {"name": "SameFormat", "city": "Paris", "employees_count": 3}
+    company_id = client.post("/companies", json=data).json["id"]
+    client.patch(f"/companies/{company_id}", json={"country": "France"})
+    listed = client.get("/companies").json
+    assert listed == [client.get(f"/companies/{company_id}").json]
+
+def test_delete_parent_company_does_not_load_children(client):
+    """DELETE /companies/<id> should neither load nor update the children."""
+    parent_id = client.post("/companies", json={"name": "Parent"}).json["id"]
+    child_id = client.post("/companies", json={"name": "Child"}).json["id"]
+    client.patch(f"/companies/{child_id}", json={"parent_id": parent_id})
+    assert [c.id for c in Company.get_by_id(parent_id).children] == [child_id]
+    db.session.expunge_all()
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.delete(f"/companies/{parent_id}")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 204
+    assert not [s for s in statements if "parent_id =" in s or "UPDATE" in s]
+
+def test_put_company_not_found_skips_validation(client):
+    """PUT /companies/<id> with unknown id should return 404 before validating."""
+    response = client.put("/companies/unknown-id", json={})
+    assert response.status_code == 404
+
+def test_post_company_references_preloaded(client, monkeypatch):
+    """POST /companies should check name and parent without per-field lookups."""
+    parent_id = client.post("/companies", json={"name": "Preloaded"}).json["id"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("unexpected per-field lookup")
+
+    monkeypatch.setattr(Company, "name_exists", fail)
+    response = client.post("/companies", json={"name": "Preloaded"})
+    assert response.status_code == 400
+    assert "name" in response.json["errors"]
+
+    monkeypatch.setattr(Company, "id_exists", fail)
+    response = client.post("/companies", json={"name": "Other", "parent_id": parent_id})
+    assert response.status_code == 201
+    response = client.post(
+        "/companies",
+        json={"name": "Orphan", "parent_id": "00000000-0000-0000-0000-000000000000"}
+    )
+    assert response.status_code == 400
+    assert "parent_id" in response.json["errors"]
+
+def test_post_company_invalid_urls(client):
+    """POST /companies with non HTTP(S) URLs should fail validation."""
+    data = {
+        "name": "UrlTest",
+        "website": "ftp://example.com",
+        "logo_url": "example.com/logo.png"
+    }
+    response = client.post("/companies", json=data)
+    assert response.status_code == 400
+    assert response.json["errors"]["website"] == ["Website must be a valid URL."]
+    assert response.json["errors"]["logo_url"] == ["Logo URL must be a valid URL."]
+
+def test_validation_cache_tracks_database_state(app, client, monkeypatch):
+    """With VALIDATION_CACHE, repeated payloads keep the right outcome."""
+    monkeypatch.setitem(app.config, 'VALIDATION_CACHE', True)
+    invalid = {"name": "Cached", "employees_count": -1}
+    for _ in range(2):
+        response = client.post("/companies", json=invalid)
+        assert response.status_code == 400
+        assert "employees_count" in response.json["errors"]
+
+    data = {"name": "Cached"}
+    assert client.post("/companies", json=data).status_code == 201
+    # Same payload, but the name is now taken
+    response = client.post("/companies", json=data)
+    assert response.status_code == 400
+    assert response.json["errors"]["name"] == ["Name must be unique."]
+
+def test_company_exists_lookups(client):
+    """Company.name_exists and Company.id_exists answer without loading rows."""
+    company_id = client.post("/companies", json={"name": "Exists"}).json["id"]
+    assert Company.name_exists("Exists") is True
+    assert Company.name_exists("Missing") is False
+    assert Company.id_exists(company_id) is True
+    assert Company.id_exists("00000000-0000-0000-0000-000000000000") is False
+    assert Company.id_exists("not-a-uuid") is False
+
+def test_post_companies_bulk(client):
+    """POST /companies/bulk should create all the companies at once."""
+    parent_id = client.post("/companies", json={"name": "BulkParent"}).json["id"]
+    data = [
+        {"name": "Bulk1"},
+        {"name": "Bulk2", "parent_id": parent_id.upper()},
+    ]
+    response = client.post("/companies/bulk", json=data)
+    assert response.status_code == 201
+    ids = response.json["ids"]
+    assert len(ids) == 2
+    assert client.get(f"/companies/{ids[0]}").json["name"] == "Bulk1"
+    assert client.get(f"/companies/{ids[1]}").json["parent_id"] == parent_id
+    created = client.get(f"/companies/{ids[0]}").json
+    assert created["created_at"] is not None
+    assert created["updated_at"] == created["created_at"]
+
+def test_post_companies_bulk_is_all_or_nothing(client):
+    """POST /companies/bulk should create nothing if one record is invalid."""
+    client.post("/companies", json={"name": "Taken"})
+    data = [
+        {"name": "Fine"},
+        {"name": "Taken"},
+        {"name": "Fine"},
+        {"employees_count": -1},
+        {"name": "Orphan", "parent_id": "00000000-0000-0000-0000-000000000000"},
+    ]
+    response = client.post("/companies/bulk", json=data)
+    assert response.status_code == 400
+    assert response.json["errors"] == [
+        {"index": 1, "errors": {"name": ["Name must be unique."]}},
+        {"index": 2, "errors": {"name": ["Name must be unique."]}},
+        {"index": 3, "errors": {
+            "name": ["Missing data for required field."],
+            "employees_count": [
+                "Employees count must be a non-negative integer."
+            ],
+        }},
+        {"index": 4, "errors": {
+            "parent_id": ["Parent company does not exist."]
+        }},
+    ]
+    assert not Company.name_exists("Fine")
+
+def test_post_companies_bulk_not_a_list(client):
+    """POST /companies/bulk with a non-list payload should return 400."""
+    response = client.post("/companies/bulk", json={"name": "Single"})
+    assert response.status_code == 400
+
+def test_requests_reuse_prebuilt_schemas(client, monkeypatch):
+    """Handling requests should not build (and reflect) any CompanySchema."""
+    def fail(*args, **kwargs):
+        raise AssertionError("CompanySchema built during a request")
+
+    monkeypatch.setattr(CompanySchema, "__init__", fail)
+    company_id = client.post("/companies", json={"name": "Prebuilt"}).json["id"]
+    assert client.get(f"/companies/{company_id}").status_code == 200
+    assert client.put(
+        f"/companies/{company_id}", json={"name": "Rebuilt"}
+    ).status_code == 200
+    assert client.patch(
+        f"/companies/{company_id}", json={"city": "Lyon"}
+    ).status_code == 200
+    assert client.post("/companies/bulk", json=[{"name": "Bulk"}]).status_code == 201
+
+def test_patch_company_malformed_parent_id(client):
+    """PATCH with a malformed parent_id fails without looking it up."""
+    company_id = client.post("/companies", json={"name": "Malformed"}).json["id"]
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.patch(
+            f"/companies/{company_id}", json={"parent_id": "not-a-uuid"}
+        )
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+    assert response.status_code == 400
+    assert response.json["errors"]["parent_id"] == ["Parent ID must be a valid UUID."]
+    # Only the company being patched is fetched
+    assert len(statements) == 1
+
+def test_validation_errors_logged_at_debug(client, caplog):
+    """Validation failures are client errors: nothing above DEBUG is logged."""
+    with caplog.at_level(logging.DEBUG, logger="app.logger"):
+        response = client.post("/companies", json={"name": ""})
+    assert response.status_code == 400
+    records = [r for r in caplog.records if "Validation error" in r.getMessage()]
+    assert [r.levelno for r in records] == [logging.DEBUG]
+
+def test_write_schemas_load_plain_dicts(app):
+    """PUT/PATCH validation should load dicts, not throwaway Company objects."""
+    with app.test_request_context():
+        assert company_schema_partial.load({"city": "Lyon"}) == {"city": "Lyon"}
+        assert company_schema.load({"name": "Plain"}) == {"name": "Plain"}
+
+def test_get_schema_reuses_instances():
+    """get_schema should build one CompanySchema per set of options."""
+    assert get_schema() is company_schema
+    assert get_schema(partial=True) is company_schema_partial
+    assert get_schema(db_checks=False) is company_import_schema
+    only = get_schema(only=["id", "name"])
+    assert get_schema(only=("name", "id")) is only
+    assert set(only.fields) == {"id", "name"}
+    assert get_schema(exclude=["description"]) is not company_schema
+
+def test_uppercase_company_ids_accepted(client):
+    """Company IDs in uppercase should resolve like their canonical form."""
+    parent_id = client.post("/companies", json={"name": "UpperParent"}).json["id"]
+    response = client.post(
+        "/companies", json={"name": "UpperChild", "parent_id": parent_id.upper()}
+    )
+    assert response.status_code == 201
+    child_id = response.json["id"]
+
+    response = client.patch(
+        f"/companies/{child_id}", json={"parent_id": parent_id.upper()}
+    )
+    assert response.status_code == 200
+    assert response.json["parent_id"] == parent_id
+
+    response = client.get(f"/companies/{child_id.upper()}")
+    assert response.status_code == 200
+    assert response.json["id"] == child_id
+
+def test_post_company_empty_optional_strings(client):
+    """Empty email, website and logo_url are accepted as before."""
+    data = {"name": "Blank", "email": "", "website": "", "logo_url": ""}
+    response = client.post("/companies", json=data)
+    assert response.status_code == 201
+    response = client.post("/companies", json={"name": "Loose", "email": "a@b"})
+    assert response.status_code == 201
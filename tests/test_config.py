@@ -6,6 +6,7 @@ expected configuration values.
 """
 
 import json
+from app.config import engine_options
 
 def test_config_endpoit(client):
     """
@@ -19,3 +20,32 @@ def test_config_endpoit(client):
     assert "FLASK_ENV" in data
     assert "DEBUG" in data
     assert "DATABASE_URI" in data
+
+
+def test_engine_options_postgresql():
+    """
+    Test that PostgreSQL engines batch executemany() INSERTs.
+    """
+    options = engine_options('postgresql://user:pass@db/companies')
+    assert options['executemany_mode'] == 'values_plus_batch'
+    assert options['pool_size'] == 25
+    assert options['max_overflow'] == 25
+    assert options['pool_pre_ping'] is True
+
+
+def test_engine_options_pool_size_from_env(monkeypatch):
+    """
+    Test that the pool size can be overridden from the environment.
+    """
+    monkeypatch.setenv('DB_POOL_SIZE', '5')
+    monkeypatch.setenv('DB_MAX_OVERFLOW', '0')
+    options = engine_options('postgresql://user:pass@db/companies')
+    assert options['pool_size'] == 5
+    assert options['max_overflow'] == 0
+
+
+def test_engine_options_sqlite():
+    """
+    Test that neither pooling nor driver options are set for SQLite.
+    """
+    assert engine_options('sqlite:///:memory:') == {}
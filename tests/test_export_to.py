@@ -1,3 +1,4 @@
+import csv
 import io
 
 def test_export_csv_success(client):
@@ -23,3 +24,30 @@ def test_export_csv_empty(client):
     content = response.data.decode('utf-8')
     # Should at least contain headers
     assert "id" in content  # Adapt to your CSV headers
+
+def test_export_csv_with_rows(client):
+    """
+    Test that every company is streamed as a CSV row after the header.
+    """
+    client.post('/companies', json={'name': 'Exported', 'city': 'Paris'})
+    response = client.get('/export/csv')
+    assert response.status_code == 200
+    assert response.is_streamed
+    rows = list(csv.DictReader(io.StringIO(response.data.decode('utf-8'))))
+    assert len(rows) == 1
+    assert rows[0]['name'] == 'Exported'
+    assert rows[0]['city'] == 'Paris'
+    assert rows[0]['created_at']
+
+def test_export_csv_several_batches(client, monkeypatch):
+    """
+    Test that rows fetched over several batches are all exported.
+    """
+    monkeypatch.setattr('app.resources.export_to.EXPORT_BATCH_SIZE', 2)
+    for i in range(5):
+        client.post('/companies', json={'name': f'Exported {i}'})
+    response = client.get('/export/csv')
+    rows = list(csv.DictReader(io.StringIO(response.data.decode('utf-8'))))
+    assert sorted(row['name'] for row in rows) == [
+        f'Exported {i}' for i in range(5)
+    ]
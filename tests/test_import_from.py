@@ -1,5 +1,6 @@
 import io
 import json
+import tempfile
 
 def test_import_json_success(client):
     """
@@ -136,3 +137,115 @@ def test_import_csv_partial_success(client):
     assert response.status_code == 207
     assert b"records imported" in response.data
     assert b"errors" in response.data
+
+def test_import_json_duplicate_names_in_file(client):
+    """
+    Test that a name repeated within the same JSON file is rejected.
+    """
+    data = [
+        {"name": "Dummy 1"},
+        {"name": "Dummy 1"}
+    ]
+    file_data = io.BytesIO(json.dumps(data).encode("utf-8"))
+    response = client.post(
+        "/import/json",
+        data={"file": (file_data, "dummies.json")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 207
+    assert response.json["errors"][0]["index"] == 1
+    assert len(client.get("/companies").json) == 1
+
+def test_import_csv_batches(client, monkeypatch):
+    """
+    Test that CSV rows are inserted across several batches.
+    """
+    monkeypatch.setattr("app.bulk.BATCH_SIZE", 2)
+    csv_content = "name\n" + "".join(f"Dummy {i}\n" for i in range(5))
+    file_data = io.BytesIO(csv_content.encode("utf-8"))
+    response = client.post(
+        "/import/csv",
+        data={"file": (file_data, "dummies.csv")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    assert b"5 records imported successfully" in response.data
+    names = {c["name"] for c in client.get("/companies").json}
+    assert names == {f"Dummy {i}" for i in range(5)}
+
+def test_import_csv_invalid_encoding(client):
+    """
+    Test importing a CSV file that is not valid UTF-8.
+    """
+    file_data = io.BytesIO(b"name\n\xff\xfe\n")
+    response = client.post(
+        "/import/csv",
+        data={"file": (file_data, "dummies.csv")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 400
+    assert b"Invalid CSV file" in response.data
+
+def test_import_json_checks_existing_names_and_parents(client):
+    """
+    Test that names already stored and unknown parents are rejected.
+    """
+    parent_id = client.post("/companies", json={"name": "Parent"}).json["id"]
+    data = [
+        {"name": "Parent"},
+        {"name": "Child", "parent_id": parent_id.upper()},
+        {"name": "Orphan", "parent_id": "00000000-0000-0000-0000-000000000000"},
+        {"name": "Malformed", "parent_id": "not-a-uuid"}
+    ]
+    file_data = io.BytesIO(json.dumps(data).encode("utf-8"))
+    response = client.post(
+        "/import/json",
+        data={"file": (file_data, "dummies.json")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 207
+    assert [e["index"] for e in response.json["errors"]] == [0, 2, 3]
+    names = {c["name"] for c in client.get("/companies").json}
+    assert names == {"Parent", "Child"}
+    children = [c for c in client.get("/companies").json if c["name"] == "Child"]
+    assert children[0]["parent_id"] == parent_id
+
+def test_import_csv_stream_without_readable(client, monkeypatch):
+    """
+    Test importing a CSV upload spooled to a file object without readable(),
+    as SpooledTemporaryFile is before Python 3.11.
+    """
+    class SpooledWithoutReadable(tempfile.SpooledTemporaryFile):
+        @property
+        def readable(self):
+            raise AttributeError("readable")
+
+    monkeypatch.setattr(
+        "werkzeug.formparser.SpooledTemporaryFile", SpooledWithoutReadable
+    )
+    csv_content = 'name,description\r\nDummy 1,"line 1\nline 2"\r\n'
+    file_data = io.BytesIO(csv_content.encode("utf-8"))
+    response = client.post(
+        "/import/csv",
+        data={"file": (file_data, "dummies.csv")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    companies = client.get("/companies").json
+    assert [c["description"] for c in companies] == ["line 1\nline 2"]
+
+def test_import_json_sets_timestamps(client):
+    """
+    Test that imported records get created_at and updated_at like POST.
+    """
+    data = [{"name": "Dummy 1"}, {"name": "Dummy 2"}]
+    file_data = io.BytesIO(json.dumps(data).encode("utf-8"))
+    response = client.post(
+        "/import/json",
+        data={"file": (file_data, "dummies.json")},
+        content_type="multipart/form-data"
+    )
+    assert response.status_code == 200
+    for company in client.get("/companies").json:
+        assert company["created_at"] is not None
+        assert company["updated_at"] == company["created_at"]
@@ -43,12 +43,15 @@ def test_handle_404(client):
     assert response.get_json()["message"] == "Resource not found"
 
 
-def test_error_handler_400(client):
+def test_error_handler_400():
     """
     Test that a 400 Bad Request error returns the correct JSON response.
     """
     from werkzeug.exceptions import BadRequest
 
+    # Routes can only be added before the first request: use a fresh app
+    client = app.create_app('app.config.TestingConfig').test_client()
+
     @client.application.route("/bad")
     def bad():
         raise BadRequest()
@@ -58,10 +61,11 @@ def test_error_handler_400(client):
     assert response.get_json() == {"message": "Bad request"}
 
 
-def test_error_handler_500(client):
+def test_error_handler_500():
     """
     Test that a 500 Internal Server Error returns the correct JSON response.
     """
+    client = app.create_app('app.config.TestingConfig').test_client()
     # Désactive la propagation pour tester le handler 500
     client.application.config["PROPAGATE_EXCEPTIONS"] = False
 
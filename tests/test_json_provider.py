@@ -0,0 +1,93 @@
+"""
+test_json_provider.py
+---------------------
+This module contains tests for the orjson based Flask JSON provider.
+"""
+import datetime
+import decimal
+import uuid
+
+import orjson
+import pytest
+from app.json_provider import OrjsonProvider
+
+
+def test_app_uses_orjson_provider(app):
+    """
+    Test that the application factory installs the orjson provider.
+    """
+    assert isinstance(app.json, OrjsonProvider)
+
+
+def test_dumps_and_loads_round_trip(app):
+    """
+    Test that the provider serializes the types used by the API.
+    """
+    company_id = uuid.uuid4()
+    data = {
+        "id": company_id,
+        "created_at": datetime.datetime(2025, 6, 13, 7, 18, 14),
+        "capital": decimal.Decimal("10.50"),
+    }
+    assert app.json.loads(app.json.dumps(data)) == {
+        "id": str(company_id),
+        "created_at": "2025-06-13T07:18:14",
+        "capital": "10.50",
+    }
+
+
+def test_dumps_unsupported_type(app):
+    """
+    Test that unsupported types raise a TypeError.
+    """
+    with pytest.raises(TypeError):
+        app.json.dumps(object())
+
+
+def test_invalid_json_body(client):
+    """
+    Test that an invalid JSON body is rejected with a 400 error.
+    """
+    response = client.post(
+        "/companies", data="{not json", content_type="application/json"
+    )
+    assert response.status_code == 400
+
+
+def test_resources_serialized_with_orjson(client, monkeypatch):
+    """
+    Test that resource responses go through orjson rather than stdlib json.
+    """
+    calls = []
+    dumps = orjson.dumps
+
+    def tracking_dumps(*args, **kwargs):
+        calls.append(args[0])
+        return dumps(*args, **kwargs)
+
+    monkeypatch.setattr(orjson, "dumps", tracking_dumps)
+    response = client.post("/companies", json={"name": "Orjson"})
+    assert response.status_code == 201
+    assert response.mimetype == "application/json"
+    assert response.json["name"] == "Orjson"
+    assert calls and calls[-1]["name"] == "Orjson"
+
+
+def test_dumps_sort_keys_and_indent(app):
+    """
+    Test that sort_keys and indent are honoured as by Flask's provider.
+    """
+    data = {"b": 1, "a": 2}
+    assert app.json.dumps(data) == '{"a":2,"b":1}'
+    assert app.json.dumps(data, sort_keys=False) == '{"b":1,"a":2}'
+    assert app.json.dumps(data, indent=2) == '{\n  "a": 2,\n  "b": 1\n}'
+
+
+def test_jsonify_sorts_keys(app, monkeypatch):
+    """
+    Test that jsonify sorts keys, and indents when compact is False.
+    """
+    with app.app_context():
+        assert app.json.response(b=1, a=2).data == b'{"a":2,"b":1}'
+        monkeypatch.setattr(app.json, "compact", False)
+        assert app.json.response(b=1).data == b'{\n  "b": 1\n}'